@@ -0,0 +1,206 @@
+"""Benchmark suite: read, write, round-trip and CLI over synthetic exchanges.
+
+    python benchmarks/bench.py                       # 1k and 100k lines
+    python benchmarks/bench.py --sizes 10M --scenarios read
+    python benchmarks/bench.py --save                # store new baselines
+    python benchmarks/bench.py --check               # fail on regressions
+
+Each measurement runs in a fresh process so peak memory (max RSS growth
+over the process baseline) isn't polluted by previous runs. Files are
+generated once per schema and size under benchmarks/.data.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from operator import itemgetter
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+# pylint: disable=wrong-import-position
+from py2flat import generator  # noqa: E402
+from py2flat.exchange import Exchange  # noqa: E402
+from py2flat.parser import Parser  # noqa: E402
+
+SCHEMAS = {
+    "shallow": os.path.join(HERE, "schemas", "shallow.json"),
+    "deep": os.path.join(HERE, "schemas", "deep.json"),
+}
+SIZES = {"1k": 1_000, "100k": 100_000, "10M": 10_000_000}
+SCENARIOS = ("read", "write", "roundtrip", "cli")
+BASELINES = os.path.join(HERE, "baselines.json")
+MIN_TIME = 0.5
+MAX_RUNS = 50
+DATA = os.path.join(HERE, ".data")
+
+
+def write(schema, filepath: str, records: list) -> None:
+    """Encode records (as yielded by generate_records) to filepath."""
+    exchange = Exchange(schema)
+    with open(filepath, "w", encoding="utf-8") as file:
+        with exchange.open(file) as writer:
+            for name, group in itertools.groupby(records, key=itemgetter(0)):
+                writer.add_segments(name, map(itemgetter(1), group))
+
+
+def data_file(schema_name: str, size: str) -> str:
+    filepath = os.path.join(DATA, f"{schema_name}-{size}.txt")
+    if not os.path.exists(filepath):
+        os.makedirs(DATA, exist_ok=True)
+        schema = Parser.from_file(SCHEMAS[schema_name])
+        with open(filepath + ".tmp", "w", encoding="utf-8") as file:
+            generator.generate(schema, file, SIZES[size])
+        os.replace(filepath + ".tmp", filepath)
+    return filepath
+
+
+def _count_lines(filepath: str) -> int:
+    with open(filepath, "rb") as file:
+        return (
+            sum(chunk.count(b"\n") for chunk in iter(lambda: file.read(1 << 20), b""))
+            + 1
+        )
+
+
+def _maxrss(who: int = resource.RUSAGE_SELF) -> int:
+    """Max RSS in bytes (kilobytes on Linux, bytes on macOS)."""
+    rss = resource.getrusage(who).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _measure(scenario: str, schema_name: str, size: str, repeat: int) -> dict:
+    """Run in a fresh worker process, best of `repeat` runs (more for short
+    runs, until about MIN_TIME seconds were measured)."""
+    schema = Parser.from_file(SCHEMAS[schema_name])
+    source = data_file(schema_name, size)
+    target = os.path.join(DATA, f"out-{os.getpid()}.txt")
+    lines, nbytes = _count_lines(source), os.path.getsize(source)
+
+    def run():
+        if scenario == "read":
+            schema.read_file(source)
+        elif scenario == "write":
+            write(schema, target, records)
+        elif scenario == "roundtrip":
+            write(schema, target, records)
+            schema.read_file(target)
+        elif scenario == "cli":
+            subprocess.run(
+                [sys.executable, "-m", "py2flat", "parse", source]
+                + ["-s", SCHEMAS[schema_name], "-o", os.devnull, "--no-cache"],
+                check=True,
+                stdout=subprocess.DEVNULL,
+                cwd=os.path.dirname(HERE),
+            )
+
+    # Generated up front, timings only measure encoding
+    records = []
+    if scenario in ("write", "roundtrip"):
+        records = list(generator.generate_records(schema, SIZES[size]))
+    base = _maxrss()
+    best, elapsed, runs = float("inf"), 0.0, 0
+    while runs < repeat or (elapsed < MIN_TIME and runs < MAX_RUNS):
+        start = time.perf_counter()
+        run()
+        duration = time.perf_counter() - start
+        best, elapsed, runs = min(best, duration), elapsed + duration, runs + 1
+
+    if os.path.exists(target):
+        os.remove(target)
+
+    peak = _maxrss(
+        resource.RUSAGE_CHILDREN if scenario == "cli" else resource.RUSAGE_SELF
+    )
+    if scenario != "cli":
+        peak -= base
+
+    return {
+        "seconds": round(best, 6),
+        "lines_per_sec": round(lines / best),
+        "mb_per_sec": round(nbytes / best / 1e6, 2),
+        "peak_mb": round(peak / 1e6, 1),
+    }
+
+
+def measure(scenario: str, schema_name: str, size: str) -> dict:
+    repeat = 3 if SIZES[size] <= 100_000 else 1
+    # Generate data up front, out of the measured process
+    data_file(schema_name, size)
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(_measure, scenario, schema_name, size, repeat).result()
+
+
+def _load_baselines(filepath: str) -> dict:
+    if not os.path.exists(filepath):
+        return {}
+    with open(filepath, encoding="utf-8") as file:
+        return json.load(file).get("results", {})
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1k,100k", help=", ".join(SIZES))
+    parser.add_argument("--schemas", default=",".join(SCHEMAS))
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--baselines", default=BASELINES)
+    parser.add_argument(
+        "--save", action="store_true", help="Store results as baselines."
+    )
+    parser.add_argument("--check", action="store_true", help="Exit 1 on regressions.")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="Allowed slowdown (default 20%%)."
+    )
+    args = parser.parse_args(argv)
+
+    baselines = _load_baselines(args.baselines)
+    results, regressions = {}, []
+
+    print(f"{'benchmark':<28}{'lines/s':>12}{'MB/s':>9}{'peak MB':>9}{'vs base':>9}")
+    for scenario in args.scenarios.split(","):
+        for schema_name in args.schemas.split(","):
+            for size in args.sizes.split(","):
+                key = f"{scenario}/{schema_name}/{size}"
+                res = results[key] = measure(scenario, schema_name, size)
+
+                delta = ""
+                if key in baselines:
+                    ratio = res["lines_per_sec"] / baselines[key]["lines_per_sec"] - 1
+                    delta = f"{ratio:+.0%}"
+                    if ratio < -args.tolerance:
+                        regressions.append(key)
+
+                print(
+                    f"{key:<28}{res['lines_per_sec']:>12,}{res['mb_per_sec']:>9}"
+                    f"{res['peak_mb']:>9}{delta:>9}"
+                )
+
+    if args.save:
+        baselines.update(results)
+        with open(args.baselines, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "results": dict(sorted(baselines.items())),
+                },
+                file,
+                indent=4,
+            )
+            file.write("\n")
+
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}")
+        return 1 if args.check else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+from py2flat.cli import cli
+
+if __name__ == "__main__":
+    cli()
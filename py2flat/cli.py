@@ -1,9 +1,19 @@
 import os
+import sys
+import time
+from contextlib import ExitStack
+from typing import Any, Generator
 
 import click
 
+from py2flat import generator
+from py2flat.errors import Errors
+from py2flat.exceptions import ErrorBudgetExceeded
 from py2flat.parser import Parser
-from py2flat.utils import json_dump
+from py2flat.schemas import Schema
+from py2flat.stats import Stats
+from py2flat.tail import Checkpoint
+from py2flat.utils import DEFAULT_BATCH, json_dump, json_line
 
 CONTEXT_SETTINGS = dict(
     help_option_names=["-h", "--help"],
@@ -15,6 +25,167 @@ def cli():
     """CLI"""
 
 
+def _files(source: str) -> list[str]:
+    if not os.path.isdir(source):
+        return [source]
+    return [
+        os.path.join(root, name) for root, _, names in os.walk(source) for name in names
+    ]
+
+
+def _record_batches(
+    parser: Schema, source: str, silent: bool, stats: Stats, errors: Errors
+) -> Generator[list[dict], Any, Any]:
+    """Top-level records of each file, read incrementally."""
+    for filepath in _files(source):
+        name = os.path.basename(filepath)
+        batch = []
+        try:
+            with ExitStack() as stack:
+                for collector in (stats, errors):
+                    if collector is not None:
+                        stack.enter_context(collector.file(name))
+                file = stack.enter_context(open(filepath, "rb"))
+
+                for segment, values in parser.iter_records(file, stats, errors):
+                    batch.append({"file": name, "segment": segment, "values": values})
+                    if len(batch) >= DEFAULT_BATCH:
+                        yield batch
+                        batch = []
+        except Exception as error:  # pylint: disable=broad-except
+            if not silent or isinstance(error, ErrorBudgetExceeded):
+                raise
+            batch.append({"file": name, "error": str(error)})
+        yield batch
+
+
+def _file_batches(
+    parser: Schema, source: str, jobs: int, kwargs: dict
+) -> Generator[list[dict], Any, Any]:
+    if not os.path.isdir(source):
+        content = parser.read_file(source, **kwargs)
+        yield [{"file": os.path.basename(source), "content": content}]
+        return
+
+    for filepath, res in parser.read_dir(source, jobs=jobs or None, **kwargs):
+        yield [{"file": filepath, "content": res}]
+
+
+def _write_ndjson(batches: Generator[list[dict], Any, Any], output: str) -> int:
+    """Write and flush each batch as soon as it comes, return the number of
+    objects written."""
+    count = 0
+    with ExitStack() as stack:
+        if output:
+            stream = stack.enter_context(open(output, "w", encoding="utf-8"))
+        else:
+            stream = sys.stdout
+        for batch in batches:
+            if batch:
+                stream.write("".join(json_line(item) + "\n" for item in batch))
+                stream.flush()
+                count += len(batch)
+    return count
+
+
+def _write_csv(
+    parser: Schema,
+    source: str,
+    output: str,
+    delimiter: str,
+    silent: bool,
+    stats: Stats,
+    errors: Errors,
+) -> int:
+    """Rows of every file, return the number of rows written."""
+    from py2flat.sinks import CsvSink  # pylint: disable=import-outside-toplevel
+
+    with CsvSink(parser, output, delimiter=delimiter) as sink:
+        for filepath in _files(source):
+            try:
+                sink.write_file(filepath, stats, errors)
+            except Exception as error:  # pylint: disable=broad-except
+                if not silent or isinstance(error, ErrorBudgetExceeded):
+                    raise
+                # None of its rows were written
+                click.echo(f"{os.path.basename(filepath)}: {error}", err=True)
+    return sum(sink.rows.values())
+
+
+def _output_csv(
+    parser: Schema, source: str, output: str, fmt: str, kwargs: dict
+) -> None:
+    if not output:
+        raise click.UsageError("CSV files are written to --output directory.")
+    delimiter = "\t" if fmt == "tsv" else ","
+    count = _write_csv(
+        parser,
+        source,
+        output,
+        delimiter,
+        kwargs["silent"],
+        kwargs["stats"],
+        kwargs["errors"],
+    )
+    click.echo(f"{count} row(s) written to {output}")
+
+
+def _output_ndjson(
+    parser: Schema, source: str, output: str, unit: str, jobs: int, kwargs: dict
+) -> None:
+    if unit == "record":
+        if kwargs["layout"] != "nested":
+            raise click.UsageError("Records are only streamed as nested.")
+        batches = _record_batches(
+            parser, source, kwargs["silent"], kwargs["stats"], kwargs["errors"]
+        )
+    else:
+        batches = _file_batches(parser, source, jobs, kwargs)
+    count = _write_ndjson(batches, output)
+    # Standard output only holds JSON lines
+    click.echo(f"{count} object(s) written", err=True)
+
+
+def _output_json(
+    parser: Schema, source: str, output: str, fmt: str, jobs: int, kwargs: dict
+) -> None:
+    if os.path.isdir(source):
+        content = [
+            {"file": filepath, "content": res}
+            for filepath, res in parser.read_dir(source, jobs=jobs or None, **kwargs)
+        ]
+    else:
+        content = parser.read_file(source, **kwargs)
+    message = f"{len(content)} file(s) found"
+
+    if fmt == "json":
+        content = json_dump(content)
+
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            file.write(content)
+    else:
+        click.echo(content)
+
+    click.echo(message)
+
+
+def _report(stats: Stats, report: str, errors: Errors, quarantine: str) -> None:
+    if stats is not None:
+        click.echo(stats.table() if report == "table" else stats.json(), err=True)
+    if errors is not None:
+        _report_errors(errors, quarantine)
+
+
+def _report_errors(errors: Errors, quarantine: str) -> None:
+    for error in errors.errors:
+        click.echo(error, err=True)
+    click.echo(f"{len(errors)} error(s), {errors.records} record(s) skipped", err=True)
+    if quarantine:
+        with open(quarantine, "wb") as file:
+            errors.write_rejected(file)
+
+
 @click.command()
 @click.argument("source")
 @click.option("--schema", "-s", required=True)
@@ -22,39 +193,283 @@ def cli():
 @click.option(
     "--format",
     "-f",
-    type=click.Choice(["json", "text"], case_sensitive=False),
+    type=click.Choice(["json", "text", "ndjson", "csv", "tsv"], case_sensitive=False),
     default="json",
+    help="ndjson: one compact JSON object per line, written as parsed. "
+    "csv/tsv: one file per segment in the --output directory.",
+)
+@click.option(
+    "--unit",
+    type=click.Choice(["file", "record"], case_sensitive=False),
+    default="file",
+    help="NDJSON objects hold a whole file or a single top-level record.",
 )
 @click.option(
     "--separator",
     default=", ",
     help="Separator for plain text format.",
 )
+@click.option(
+    "--layout",
+    type=click.Choice(["nested", "columns"], case_sensitive=False),
+    default="nested",
+    help="Nested records or one column per element.",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(["python", "numpy"], case_sensitive=False),
+    default="python",
+    help="NumPy engine converts whole columns at once (if installed).",
+)
 @click.option("--silent", is_flag=True, default=False)
-def parse(source: str, output: str, silent: bool, **options):
+@click.option(
+    "--jobs",
+    "-j",
+    type=int,
+    default=1,
+    help="Number of worker processes for directories (0: one per CPU).",
+)
+@click.option(
+    "--stats",
+    "report",
+    type=click.Choice(["table", "json"], case_sensitive=False),
+    is_flag=False,
+    flag_value="table",
+    default=None,
+    help="Print parsing statistics to stderr (default: table).",
+)
+@click.option(
+    "--tolerant",
+    is_flag=True,
+    default=False,
+    help="Skip invalid records and report them to stderr.",
+)
+@click.option(
+    "--max-errors",
+    type=int,
+    help="Abort after N errors (implies --tolerant).",
+)
+@click.option(
+    "--quarantine",
+    help="Write lines of skipped records to this file (implies --tolerant).",
+)
+@click.option(
+    "--manifest",
+    help="Only parse new or changed files of a directory, tracked in this file.",
+)
+@click.option(
+    "--keep-results",
+    is_flag=True,
+    default=False,
+    help="Store results in the manifest and output unchanged files too.",
+)
+def parse(
+    source: str,
+    output: str,
+    silent: bool,
+    jobs: int,
+    layout: str,
+    engine: str,
+    report: str,
+    tolerant: bool,
+    max_errors: int,
+    quarantine: str,
+    manifest: str,
+    keep_results: bool,
+    unit: str,
+    **options,
+):
     """Parse"""
 
     parser = Parser.from_file(options["schema"])
+    stats = Stats() if report else None
+    errors = None
+    if tolerant or max_errors is not None or quarantine:
+        errors = Errors(max_errors=max_errors, quarantine=bool(quarantine))
+    kwargs = {
+        "silent": silent,
+        "layout": layout,
+        "engine": engine,
+        "stats": stats,
+        "errors": errors,
+    }
 
-    if os.path.isdir(source):
-        content = []
-        for filepath, res in parser.read_dir(source, silent=silent):
-            content.append({"file": filepath, "content": res})
-    else:
-        content = parser.read_file(source, silent=silent)
+    streamed = options["format"] in ("csv", "tsv") or (
+        options["format"] == "ndjson" and unit == "record"
+    )
+    if manifest and streamed:
+        raise click.UsageError("--manifest only applies to whole file results.")
+    if manifest and os.path.isdir(source):
+        from py2flat.manifest import Manifest  # pylint: disable=import-outside-toplevel
 
-    message = f"{len(content)} file(s) found"
+        kwargs["manifest"] = Manifest.load(manifest, results=keep_results)
 
-    if options["format"] == "json":
-        content = json_dump(content)
+    try:
+        if options["format"] in ("csv", "tsv"):
+            _output_csv(parser, source, output, options["format"], kwargs)
+        elif options["format"] == "ndjson":
+            _output_ndjson(parser, source, output, unit, jobs, kwargs)
+        else:
+            _output_json(parser, source, output, options["format"], jobs, kwargs)
+    except ErrorBudgetExceeded as error:
+        # What was collected until then matters most on an aborted run
+        _report(stats, report, errors, quarantine)
+        raise click.ClickException(str(error)) from error
+
+    _report(stats, report, errors, quarantine)
+
+
+@click.command()
+@click.option("--schema", "-s", required=True)
+@click.option("--lines", "-n", type=int, required=True, help="About N lines.")
+@click.option("--output", "-o", help="Output file (default: stdout).")
+@click.option("--seed", type=int, default=0, help="Same seed, same file.")
+@click.option(
+    "--fanout",
+    type=int,
+    default=generator.FANOUT,
+    help="Maximum children of each multiple segment per parent.",
+)
+def generate(schema: str, lines: int, output: str, seed: int, fanout: int):
+    """Generate a random file from a schema"""
 
+    parser = Parser.from_file(
+        schema,
+    )
+    options = {"lines": lines, "seed": seed, "fanout": fanout}
     if output:
         with open(output, "w", encoding="utf-8") as file:
-            file.write(content)
+            count = generator.generate(parser, file, **options)
     else:
-        click.echo(content)
+        count = generator.generate(parser, sys.stdout, **options)
+        click.echo()
 
-    click.echo(message)
+    click.echo(f"{count} line(s) generated", err=True)
+
+
+def _schema_arg(item: str) -> tuple[str, str]:
+    """NAME=PATH or PATH, a plain path may hold "=" too."""
+    name, _, path = item.partition("=")
+    if not path or os.path.isfile(item) or os.sep in name:
+        return "", item
+    if os.altsep and os.altsep in name:
+        return "", item
+    return name, path
+
+
+@click.command()
+@click.option(
+    "--schema",
+    "-s",
+    "schemas",
+    multiple=True,
+    required=True,
+    help="Schema file to load, as PATH or NAME=PATH (default name: schema name).",
+)
+@click.option("--host", default="127.0.0.1")
+@click.option("--port", "-p", type=int, default=8765)
+@click.option(
+    "--workers",
+    "-w",
+    type=int,
+    default=0,
+    help="Number of worker processes (0: one per CPU).",
+)
+def serve(schemas: tuple, host: str, port: int, workers: int):
+    """Parse daemon over localhost HTTP"""
+
+    # pylint: disable=import-outside-toplevel
+    import logging
+
+    from py2flat.server import Server
+
+    loaded = {}
+    for item in schemas:
+        name, path = _schema_arg(item)
+        schema = Parser.from_file(
+            path,
+        )
+        loaded[name or schema.name] = schema
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    server = Server(loaded, host=host, port=port, workers=workers or None)
+    click.echo(f"Serving {', '.join(sorted(loaded))} on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+@click.command(
+    name="client",
+    context_settings={"ignore_unknown_options": True, "help_option_names": []},
+)
+@click.argument("args", nargs=-1, type=click.UNPROCESSED)
+def client_(args: tuple):
+    """Parse a file with a running server (same as py2flat-client)"""
+
+    # pylint: disable=import-outside-toplevel
+    from py2flat import client
+
+    sys.exit(client.main(list(args), prog="py2flat client"))
+
+
+@click.command()
+@click.argument("source")
+@click.option("--schema", "-s", required=True)
+@click.option(
+    "--checkpoint",
+    "-c",
+    help="Checkpoint file (default: SOURCE.checkpoint).",
+)
+@click.option(
+    "--final",
+    is_flag=True,
+    default=False,
+    help="The file is complete, don't keep the last record pending.",
+)
+@click.option("--follow", is_flag=True, default=False, help="Keep polling SOURCE.")
+@click.option(
+    "--interval",
+    type=float,
+    default=1.0,
+    help="Seconds between polls with --follow.",
+)
+def tail(
+    source: str,
+    schema: str,
+    checkpoint: str,
+    final: bool,
+    follow: bool,
+    interval: float,
+):
+    """Parse records appended to a file since the previous run"""
+
+    parser = Parser.from_file(
+        schema,
+    )
+    checkpoint = checkpoint or f"{source}.checkpoint"
+    state = Checkpoint.load(checkpoint)
+
+    try:
+        while True:
+            content, state = parser.read_tail(source, state, final=final)
+            if content:
+                click.echo(json_dump(content))
+            state.save(checkpoint)
+            if not follow:
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+
+    click.echo(f"{state.offset} byte(s) read", err=True)
 
 
 cli.add_command(parse)
+cli.add_command(generate)
+cli.add_command(serve)
+cli.add_command(client_)
+cli.add_command(tail)
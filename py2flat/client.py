@@ -0,0 +1,85 @@
+"""Thin client of the parse daemon, standard library only so calling it
+stays cheap: neither click nor the parser are imported.
+
+    py2flat-client SOURCE --schema NAME [--url URL] [--output FILE]
+    python -m py2flat.client SOURCE --schema NAME
+"""
+import argparse
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+
+
+def request(
+    path: str, payload: dict = None, url: str = DEFAULT_URL, timeout: float = None
+) -> dict:
+    """Call a running server, POST when a payload is given."""
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(
+        url.rstrip("/") + path,
+        data=data,
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return json.loads(error.read())
+
+
+def parse(schema: str, path: str, url: str = DEFAULT_URL, **options) -> dict:
+    """Parse a file on the server host, options are passed to read_file."""
+    return request(
+        "/parse", {"schema": schema, "path": path, "options": options}, url=url
+    )
+
+
+def schemas(url: str = DEFAULT_URL) -> list[str]:
+    return request("/schemas", url=url)
+
+
+def main(argv: list[str] = None, prog: str = "py2flat-client") -> int:
+    """Parse a file with a running server, print the result as JSON."""
+    parser = argparse.ArgumentParser(prog=prog, description=main.__doc__)
+    parser.add_argument("source")
+    parser.add_argument(
+        "--schema", "-s", required=True, help="Name of a loaded schema."
+    )
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--output", "-o")
+    parser.add_argument("--layout", choices=["nested", "columns"], default="nested")
+    parser.add_argument("--silent", action="store_true")
+    args = parser.parse_args(argv)
+
+    try:
+        res = parse(
+            args.schema,
+            os.path.abspath(args.source),
+            url=args.url,
+            layout=args.layout,
+            silent=args.silent,
+        )
+    except OSError as error:
+        print(f"Error: Server unreachable at {args.url}: {error}", file=sys.stderr)
+        return 1
+    if "error" in res:
+        print(f"Error: {res['error']}", file=sys.stderr)
+        return 1
+
+    content = json.dumps(res["content"], indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(content)
+    else:
+        print(content)
+
+    print(f"Parsed in {res['elapsed'] * 1e3:.1f}ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
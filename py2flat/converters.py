@@ -1,4 +1,8 @@
 from datetime import datetime
+from functools import lru_cache
+
+# Distinct raw dates kept in memory by date converters
+DATE_CACHE_SIZE = 4096
 
 
 class Converter:
@@ -28,6 +32,11 @@ class Converter:
     def output(item):
         raise NotImplementedError()
 
+    @classmethod
+    def input_many(cls, items: list) -> list:
+        """Convert a whole column at once."""
+        return [cls.input(item) for item in items]
+
 
 # Base converters
 
@@ -60,15 +69,35 @@ class BaseFloat(Converter):
         return cls._format.format(item).replace(".", ",").rjust(cls._length, cls._fill)
 
 
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(item: str, fmt: str) -> datetime:
+    """strptime with a fast path for plain %Y%m%d digits."""
+    if fmt == "%Y%m%d" and len(item) == 8 and item.isascii() and item.isdigit():
+        return datetime(int(item[:4]), int(item[4:6]), int(item[6:]))
+    return datetime.strptime(item, fmt)
+
+
 class BaseDate(Converter):
     _format = None
 
     @classmethod
     def input(cls: Converter, item: str) -> datetime:
-        return datetime.strptime(item, cls._format)
+        return parse_date(item, cls._format)
+
+    @classmethod
+    def input_many(cls: Converter, items: list[str]) -> list[datetime]:
+        """Convert a whole column, each distinct value is parsed once."""
+        values = {item: parse_date(item, cls._format) for item in set(items)}
+        return list(map(values.__getitem__, items))
 
     @classmethod
-    def output(cls: Converter, item: datetime) -> str:
+    def output(cls: Converter, item: datetime | str) -> str:
+        # Strings come from JSON payloads (parse daemon): element format or ISO
+        if isinstance(item, str):
+            try:
+                item = parse_date(item, cls._format)
+            except ValueError:
+                item = datetime.fromisoformat(item)
         return item.strftime(cls._format)
 
 
@@ -3,15 +3,147 @@ import logging
 from dataclasses import dataclass
 from typing import Any, Literal
 
-import unidecode
-
 from py2flat.converters import Converter
 from py2flat.exceptions import ExceededSize, RequiredElementMissing
-from py2flat.utils import DEFAULT_SEPARATOR, PYTHON_TYPES, is_equal
+from py2flat.utils import (
+    DEFAULT_SEPARATOR,
+    DEFAULT_TRANSLITERATION,
+    PYTHON_TYPES,
+    get_transliteration,
+    is_equal,
+    pad,
+)
 
 _logger = logging.getLogger(__name__)
 
 
+class TextDecoder:
+    """Element.parse specialized for text without converter."""
+
+    __slots__ = ("name", "required", "default")
+
+    def __init__(self, element: "Element") -> None:
+        self.name = element.name
+        self.required = element.required
+        self.default = element.default
+
+    def __call__(self, value: str) -> str:
+        return value.strip() or self.default
+
+
+class CastDecoder(TextDecoder):
+    """Element.parse specialized for int and float without converter."""
+
+    __slots__ = ("cast",)
+
+    def __init__(self, element: "Element") -> None:
+        super().__init__(element)
+        self.cast = PYTHON_TYPES[element.ttype]
+
+    def __call__(self, value: str) -> int | float:
+        value = value.strip()
+        if not value:
+            return self.default
+
+        try:
+            return self.cast(value)
+        except ValueError as error:
+            if self.required:
+                raise RequiredElementMissing(f"{self.name}: {error}")
+            return self.default
+
+
+class ConvertDecoder(CastDecoder):
+    """Element.parse specialized for elements with a converter."""
+
+    __slots__ = ("convert",)
+
+    def __init__(self, element: "Element") -> None:
+        super().__init__(element)
+        self.convert = Converter.by_name(element.converter).input
+
+    def __call__(self, value: str) -> Any:
+        value = value.strip()
+        if not value:
+            return self.default
+
+        try:
+            value = self.cast(value)
+        except ValueError as error:
+            if self.required:
+                raise RequiredElementMissing(f"{self.name}: {error}")
+            return self.default
+
+        try:
+            return self.convert(value)
+        except Exception:  # pylint: disable=broad-except
+            return self.default
+
+
+class Encoder:
+    """set_value() followed by dump(), without touching the element."""
+
+    __slots__ = (
+        "name",
+        "size",
+        "required",
+        "default",
+        "right",
+        "fill",
+        "convert",
+        "transliterate",
+    )
+
+    def __init__(
+        self,
+        element: "Element",
+        fill: str = DEFAULT_SEPARATOR,
+        transliteration: str = DEFAULT_TRANSLITERATION,
+    ) -> None:
+        self.name = element.name
+        self.size = element.size
+        self.required = element.required
+        self.default = element.default or None
+        self.right = element.justify == "right"
+        self.fill = " " if fill == "space" else fill
+        self.convert = (
+            Converter.by_name(element.converter).output if element.converter else None
+        )
+        self.transliterate = get_transliteration(transliteration)
+
+    def __call__(self, value: Any) -> str:
+        size = self.size
+
+        if value is not None:
+            if isinstance(value, str):
+                # Converters get whole strings (eg. ISO dates), their output fits
+                if self.convert is None:
+                    value = value[:size]
+            elif not is_equal(value, size):
+                # Integer or float can't be truncate...
+                if isinstance(value, (int, float)):
+                    raise ExceededSize(f"{self.name}: '{value}'")
+                value = value[:size]
+        else:
+            value = self.default
+
+        if value is None:
+            if self.required:
+                raise RequiredElementMissing(self.name)
+            return self.fill * size
+
+        if self.convert is not None:
+            value = self.convert(value)
+
+        if isinstance(value, str):
+            if self.transliterate is not None:
+                value = self.transliterate(value)
+        else:
+            value = str(value)
+
+        return pad(value, size, self.fill, self.right)
+
+
 @dataclass(kw_only=True)
 class Element:
     name: str
@@ -80,12 +212,42 @@ class Element:
         _logger.debug("%s -> %s", raw_value, value)
         return value
 
+    def compile(self) -> TextDecoder:
+        """Resolve type and converter once, return a callable equivalent to
+        parse() for values of the right size."""
+
+        if self.ttype not in PYTHON_TYPES:
+            raise ValueError(f"{self.name}: unknow type '{self.ttype}'")
+
+        if self.converter:
+            if self.converter not in Converter.list():
+                raise ValueError(f"Unknow converter: '{self.converter}'")
+            return ConvertDecoder(self)
+
+        if self.ttype == "str":
+            return TextDecoder(self)
+        return CastDecoder(self)
+
+    def encoder(
+        self,
+        fill: str = DEFAULT_SEPARATOR,
+        transliteration: str = DEFAULT_TRANSLITERATION,
+    ) -> Encoder:
+        """Compile set_value() and dump() into a single callable."""
+
+        if self.converter and self.converter not in Converter.list():
+            raise ValueError(f"Unknow converter: '{self.converter}'")
+        return Encoder(self, fill, transliteration)
+
     def set_value(
         self, value: str | int | float, silent: bool = True
     ) -> None | ExceededSize:
         """Store value, nothing else."""
 
-        if not is_equal(value, self.size):
+        # Converters get whole strings (eg. ISO dates), their output fits
+        if isinstance(value, str) and self.converter:
+            pass
+        elif not is_equal(value, self.size):
             # Integer or float can't be truncate...
             if isinstance(value, (int, float)):
                 raise ExceededSize(f"{self.name}: '{value}'")
@@ -93,7 +255,11 @@ class Element:
 
         self._value = value
 
-    def dump(self, fill: str = DEFAULT_SEPARATOR) -> str | RequiredElementMissing:
+    def dump(
+        self,
+        fill: str = DEFAULT_SEPARATOR,
+        transliteration: str = DEFAULT_TRANSLITERATION,
+    ) -> str | RequiredElementMissing:
         """Get value ready for export."""
 
         sep = " " if fill == "space" else fill
@@ -110,19 +276,11 @@ class Element:
         if self.converter:
             value = Converter.by_name(self.converter).output(value)
 
-        # TODO: add an option to escape accented characters
-        if isinstance(value, str):
-            value = unidecode.unidecode(value)
-
-        value = str(value)
-
-        diff = self.size - len(value)
-        if diff <= 0:
-            return value
+        transliterate = get_transliteration(transliteration)
+        if isinstance(value, str) and transliterate is not None:
+            value = transliterate(value)
 
-        if self.justify == "right":
-            return value.rjust(self.size, sep)
-        return value.ljust(self.size, sep)
+        return pad(str(value), self.size, sep, self.justify == "right")
 
     def json(self):
         vals = dict(
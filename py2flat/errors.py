@@ -0,0 +1,135 @@
+"""Error-tolerant parsing.
+
+Pass an Errors instance to read_file, read_dir, read_str or read_bytes to
+keep parsing after invalid lines. Each problem is recorded as a LineError
+(line number, byte offset, segment, element, raw value) and the top-level
+record holding the line is dropped, children included, so results only
+hold complete records. Dropped lines are kept aside with quarantine=True.
+Parsing aborts with ErrorBudgetExceeded once more than max_errors problems
+were met.
+"""
+import json
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, BinaryIO, Generator
+
+from py2flat.exceptions import ErrorBudgetExceeded
+
+if TYPE_CHECKING:
+    from py2flat.plans import SegmentPlan
+
+
+def _text(raw: bytes) -> str:
+    return bytes(raw).decode("utf-8", errors="replace")
+
+
+def locate(plan: "SegmentPlan", line: bytes, error: Exception) -> dict:
+    """Element and raw value behind a decoding error, decoded again element
+    by element. The whole line is reported when it can't be pinned down."""
+    if len(line) >= plan.size:
+        items = plan.unpacker.unpack_from(line)
+        for index, (name, decoder, item) in enumerate(
+            zip(plan.names, plan.decoders, items)
+        ):
+            try:
+                value = decoder(item.decode())
+            except Exception as exc:  # pylint: disable=broad-except
+                return {"element": name, "value": _text(item), "message": str(exc)}
+            if not value and index in plan.required:
+                return {
+                    "element": name,
+                    "value": _text(item),
+                    "message": "Missing required value.",
+                }
+
+    return {"element": None, "value": _text(line), "message": str(error)}
+
+
+@dataclass(kw_only=True)
+class LineError:
+    message: str
+    line: int = None  # starts at 1, None for end-of-file checks
+    offset: int = None  # bytes from the start of the file
+    segment: str = None
+    element: str = None
+    value: str = None  # raw element value, or the whole line
+    file: str = None
+
+    def __str__(self) -> str:
+        """file:line: [segment.element] message 'value'"""
+        parts = []
+        if self.file or self.line:
+            parts.append(
+                ":".join(str(item) for item in (self.file, self.line) if item) + ":"
+            )
+        if self.segment:
+            parts.append(
+                f"[{'.'.join(item for item in (self.segment, self.element) if item)}]"
+            )
+        parts.append(self.message)
+        # Cast errors already quote the value
+        if self.value is not None and repr(self.value) not in self.message:
+            parts.append(repr(self.value))
+        return " ".join(parts)
+
+
+@dataclass(kw_only=True)
+class Errors:
+    max_errors: int = None  # None: no limit
+    quarantine: bool = False
+    errors: list[LineError] = field(default_factory=list)
+    rejected: list[bytes] = field(default_factory=list)  # quarantined lines
+    records: int = 0  # dropped records
+    _file: str = field(default=None, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.errors)
+
+    def spawn(self) -> "Errors":
+        """Empty collector with the same settings (eg. for a worker)."""
+        return Errors(max_errors=self.max_errors, quarantine=self.quarantine)
+
+    def _check(self) -> None:
+        if self.max_errors is not None and len(self.errors) > self.max_errors:
+            raise ErrorBudgetExceeded(
+                f"Too many errors ({len(self.errors)} > {self.max_errors}), "
+                f"last one: {self.errors[-1]}"
+            )
+
+    def add(self, **details) -> None:
+        self.errors.append(LineError(file=self._file, **details))
+        self._check()
+
+    def reject(self, lines: list[bytes]) -> None:
+        self.records += 1
+        if self.quarantine:
+            self.rejected += lines
+
+    @contextmanager
+    def file(self, name: str) -> Generator[None, Any, Any]:
+        self._file = name
+        try:
+            yield
+        finally:
+            self._file = None
+
+    def merge(self, other: "Errors") -> None:
+        """Add errors collected elsewhere (eg. a worker process)."""
+        self.errors += other.errors
+        self.rejected += other.rejected
+        self.records += other.records
+        self._check()
+
+    def report(self) -> dict:
+        return {
+            "errors": [asdict(error) for error in self.errors],
+            "records": self.records,
+        }
+
+    def json(self) -> str:
+        return json.dumps(self.report(), indent=4)
+
+    def write_rejected(self, fileobj: BinaryIO) -> None:
+        """Quarantined lines, ready to be fixed and parsed again."""
+        for line in self.rejected:
+            fileobj.write(line + b"\n")
@@ -16,3 +16,7 @@ class RequiredElementMissing(Py2flatException):
 
 class ElementsNumberIncorrect(Py2flatException):
     """incorrect number of elements."""
+
+
+class ErrorBudgetExceeded(Py2flatException):
+    """Too many invalid lines in error-tolerant mode."""
@@ -1,6 +1,25 @@
 from collections import Counter
+from contextlib import AbstractContextManager, nullcontext
+from typing import Generator, Iterable, TextIO
 
 from py2flat.schemas import Schema
+from py2flat.stats import Stats
+from py2flat.utils import DEFAULT_BATCH
+
+
+def _timer(stats: Stats | None) -> AbstractContextManager:
+    return nullcontext() if stats is None else stats.timer("encode")
+
+
+def _timed(batches: Iterable[list], stats: Stats | None) -> Generator[list, None, None]:
+    """Time the encoding of each batch, not what is done with it."""
+    batches = iter(batches)
+    while True:
+        with _timer(stats):
+            segments = next(batches, None)
+        if segments is None:
+            return
+        yield segments
 
 
 class Exchange:
@@ -12,10 +31,44 @@ class Exchange:
         seg = self.schema.create_segment("Header", vals)
         self.segments.insert(0, seg[0])
 
-    def add_segment(self, identifier: str, vals: dict) -> None:
-        segments = self.schema.create_segment(identifier, vals)
+    def add_segment(self, identifier: str, vals: dict, stats: Stats = None) -> None:
+        with _timer(stats):
+            segments = self.schema.create_segment(identifier, vals)
         self.segments += segments
 
+    def add_segments(
+        self,
+        identifier: str,
+        records: Iterable[dict],
+        batch: int = DEFAULT_BATCH,
+        stats: Stats = None,
+    ) -> None:
+        """Add many records of the same segment, children included."""
+        batches = self.schema.create_segments(identifier, records, batch)
+        for segments in _timed(batches, stats):
+            self.segments += segments
+
+    def write_many(
+        self,
+        fileobj: TextIO,
+        identifier: str,
+        records: Iterable[dict],
+        batch: int = DEFAULT_BATCH,
+        stats: Stats = None,
+    ) -> None:
+        """Stream records (a generator works) to a text file object after
+        segments already added, then check required segments."""
+        with self.open(fileobj, stats) as writer:
+            writer.add_segments(identifier, records, batch)
+
+    def open(self, fileobj: TextIO, stats: Stats = None) -> "ExchangeWriter":
+        """Stream segments to a text file object instead of keeping them,
+        segments already added are written first."""
+        writer = ExchangeWriter(self.schema, fileobj, stats)
+        writer.write(self.segments)
+        self.segments = []
+        return writer
+
     def check(self) -> None | ValueError:
         names = [seg.name for seg in self.segments]
         required = [seg.name for seg in self.schema.segments if seg.required]
@@ -29,6 +82,85 @@ class Exchange:
             if value > 1 and name not in multiple:
                 raise ValueError(f"Too manys segments '{name}' ({value}).")
 
-    def dump(self) -> str:
-        self.check()
-        return "\n".join([seg.dump(fill=self.schema.fill) for seg in self.segments])
+    def dump(self, stats: Stats = None) -> str:
+        """Segments are encoded once added, pass stats to add_segment and
+        add_segments to time encoding."""
+        if stats is None:
+            self.check()
+            return "\n".join([seg.line for seg in self.segments])
+
+        with stats.timer("dump"):
+            self.check()
+            for seg in self.segments:
+                stats.count(seg.name, len(seg.line))
+            return "\n".join([seg.line for seg in self.segments])
+
+
+class ExchangeWriter:
+    """Encode and write each segment as soon as it is added.
+
+    Segments count is checked along the way, required segments when the
+    writer is closed. Use it as a context manager:
+
+        with exchange.open(file) as writer:
+            writer.add_segment("Lines", vals)
+
+    Pass stats to time encoding and count the lines written.
+    """
+
+    def __init__(self, schema: Schema, fileobj: TextIO, stats: Stats = None) -> None:
+        self.schema = schema
+        self.fileobj = fileobj
+        self.stats = stats
+        self.counter = Counter()
+        self.lines = 0
+        self.multiple = {seg.name for seg in schema.segments if seg.multiple}
+
+    def __enter__(self) -> "ExchangeWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        # Don't hide the original error behind validation
+        if exc_type is None:
+            self.close()
+
+    def set_header(self, **vals: dict) -> None:
+        if self.counter:
+            raise ValueError("Header must be set before any other segment.")
+        self.add_segment("Header", vals)
+
+    def add_segment(self, identifier: str, vals: dict) -> None:
+        with _timer(self.stats):
+            segments = self.schema.create_segment(identifier, vals)
+        self.write(segments)
+
+    def add_segments(
+        self, identifier: str, records: Iterable[dict], batch: int = DEFAULT_BATCH
+    ) -> None:
+        """Encode and write records in batches, one write call per batch."""
+        batches = self.schema.create_segments(identifier, records, batch)
+        for segments in _timed(batches, self.stats):
+            self.write(segments)
+
+    def write(self, segments: list) -> None:
+        counter, lines = self.counter, []
+        for seg in segments:
+            count = counter[seg.name] + 1
+            if count > 1 and seg.name not in self.multiple:
+                raise ValueError(f"Too manys segments '{seg.name}' ({count}).")
+            lines.append(seg.line)
+            counter[seg.name] = count
+            if self.stats is not None:
+                self.stats.count(seg.name, len(seg.line))
+
+        if not lines:
+            return
+        if self.lines:
+            self.fileobj.write("\n")
+        self.fileobj.write("\n".join(lines))
+        self.lines += len(lines)
+
+    def close(self) -> None | ValueError:
+        for seg in self.schema.segments:
+            if seg.required and seg.name not in self.counter:
+                raise ValueError(f"Missing required segment: {seg.name}")
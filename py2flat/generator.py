@@ -0,0 +1,225 @@
+"""Synthetic flat files generated from a schema.
+
+Values follow each element definition (size, ttype, converter, default) and
+records get random children according to segment relations. A pool of
+random records is built once and cycled through: already encoded for files,
+which makes generation mostly a matter of writing strings.
+"""
+import itertools
+import random
+from datetime import datetime, timedelta
+from typing import Any, Generator, TextIO
+
+from py2flat.converters import BaseDate, BaseFloat, BaseInteger, Converter
+from py2flat.element import Element
+from py2flat.schemas import Schema
+from py2flat.segment import Segment
+
+# Distinct records cycled through
+TEMPLATES = 1000
+# Distinct texts per element size, values repeat as in real files
+PHRASES = 64
+# Maximum children of each multiple segment per parent
+FANOUT = 3
+# Share of optional elements left empty
+EMPTY = 0.1
+# Characters written at once
+CHUNK_SIZE = 1 << 20
+
+WORDS = (
+    "ACME Paris Lyon Marseille Saint-Étienne Société Générale Müller "
+    "widget bolt steel blue red carton pallet order delivery invoice"
+).split()
+
+
+class ValueGenerator:
+    """Random values fitting an element once encoded."""
+
+    def __init__(self, rand: random.Random) -> None:
+        self.rand = rand
+        self.phrases = {}
+
+    def text(self, size: int) -> str:
+        if size not in self.phrases:
+            rand = random.Random(size)
+            self.phrases[size] = [
+                " ".join(rand.choice(WORDS) for _ in range(size // 6 + 1))[:size]
+                for _ in range(PHRASES)
+            ]
+        return self.rand.choice(self.phrases[size])
+
+    def number(self, digits: int, decimals: int = 0) -> float | int:
+        """At most `digits` integer digits."""
+        value = self.rand.randrange(10 ** (max(digits, 1) + decimals))
+        return value / 10**decimals if decimals else value
+
+    def __call__(self, element: Element) -> Any:
+        if not element.required and self.rand.random() < EMPTY:
+            return None
+        if element.default:
+            return element.default
+
+        size = element.size
+        converter = Converter.by_name(element.converter) if element.converter else None
+
+        if converter is not None and issubclass(converter, BaseDate):
+            return datetime(2000, 1, 1) + timedelta(days=self.rand.randrange(11000))
+
+        if converter is not None and issubclass(converter, BaseFloat):
+            width = min(size, converter._length)
+            decimals = len(converter._format.format(0)) - 2
+            return self.number(width - decimals - 1, decimals)
+
+        if converter is not None and issubclass(converter, BaseInteger):
+            # Encoded as int(value * multiplier), checked as "%.2f" % value
+            scale = len(str(converter._multiplier)) - 1
+            digits = min(size, size - 3 + scale, 9)
+            return self.number(digits) / converter._multiplier
+
+        if element.ttype == "int":
+            return self.number(min(size, 9))
+
+        if element.ttype == "float":
+            return self.number(min(size - 3, 9), 2)
+
+        return self.text(size)
+
+
+class RecordGenerator:
+    """Random nested records, children included."""
+
+    def __init__(self, schema: Schema, seed: int = 0, fanout: int = FANOUT) -> None:
+        self.schema = schema
+        self.rand = random.Random(seed)
+        self.value = ValueGenerator(self.rand)
+        self.fanout = fanout
+        self.relations = schema.relations
+
+    def record(self, seg: Segment) -> dict:
+        # Identifier comes from the first element default
+        vals = {
+            element.name: value
+            for element in seg.elements[1:]
+            if (value := self.value(element)) is not None
+        }
+
+        for name in self.relations.get(seg.name, []):
+            child = self.schema.by_name[name]
+            if child.multiple:
+                count = self.rand.randint(0 if not child.required else 1, self.fanout)
+                vals[name] = [self.record(child) for _ in range(count)]
+            elif child.required or self.rand.random() < 0.5:
+                vals[name] = self.record(child)
+
+        return vals
+
+
+def _layout(schema: Schema) -> tuple[list[Segment], list[Segment], list[Segment]]:
+    """Top-level segments written once before and after the repeated ones."""
+    top = [seg for seg in schema.segments if not seg.parent]
+    body = [seg for seg in top if seg.multiple]
+    if not body:
+        return top, [], []
+
+    first = top.index(body[0])
+    last = top.index(body[-1])
+    head = [seg for seg in top[:first] if not seg.multiple]
+    tail = [seg for seg in top[last + 1 :] if not seg.multiple]
+    return head, body, tail
+
+
+def templates(
+    schema: Schema, seed: int = 0, fanout: int = FANOUT, count: int = TEMPLATES
+) -> tuple[list[tuple[str, dict]], list[tuple[str, dict]], list[tuple[str, dict]]]:
+    """(segment name, values) of head, body and tail records."""
+    generator = RecordGenerator(schema, seed=seed, fanout=fanout)
+    head, body, tail = _layout(schema)
+
+    def make(segments: list[Segment]) -> list[tuple[str, dict]]:
+        return [(seg.name, generator.record(seg)) for seg in segments]
+
+    pool = [
+        (seg.name, generator.record(seg))
+        for seg in (generator.rand.choice(body) for _ in range(count if body else 0))
+    ]
+    return make(head), pool, make(tail)
+
+
+def generate_records(
+    schema: Schema, lines: int, seed: int = 0, fanout: int = FANOUT
+) -> Generator[tuple[str, dict], Any, Any]:
+    """Yield (segment name, values) records, about `lines` lines in total
+    (children included)."""
+    head, body, tail = templates(schema, seed=seed, fanout=fanout)
+    total = sum(_count(schema, name, vals) for name, vals in head + tail)
+
+    yield from head
+    if body:
+        sizes = [_count(schema, name, vals) for name, vals in body]
+        for count, (record, size) in enumerate(itertools.cycle(zip(body, sizes))):
+            if count and total + size > lines:
+                break
+            total += size
+            yield record
+    yield from tail
+
+
+def _count(schema: Schema, name: str, vals: dict) -> int:
+    count = 1
+    for child in schema.relations.get(name, []):
+        values = vals.get(child, [])
+        for child_vals in values if isinstance(values, list) else [values]:
+            count += _count(schema, child, child_vals)
+    return count
+
+
+def _encode(schema: Schema, records: list[tuple[str, dict]]) -> list[str]:
+    return [
+        "\n".join(seg.line for seg in schema.create_segment(name, vals))
+        for name, vals in records
+    ]
+
+
+def generate(
+    schema: Schema, fileobj: TextIO, lines: int, seed: int = 0, fanout: int = FANOUT
+) -> int:
+    """Write a random file of about `lines` lines to a text file object
+    (at least one repeated record), return the number of lines written.
+
+    Records are encoded once and the resulting blocks cycled through."""
+    head, body, tail = templates(schema, seed=seed, fanout=fanout)
+    head, body, tail = (_encode(schema, part) for part in (head, body, tail))
+
+    total = 0
+    for chunk in _chunks(head, body, tail, lines):
+        if total:
+            fileobj.write("\n")
+        fileobj.write(chunk)
+        total += chunk.count("\n") + 1
+
+    return total
+
+
+def _chunks(
+    head: list[str], body: list[str], tail: list[str], lines: int
+) -> Generator[str, Any, Any]:
+    """Head blocks, body blocks cycled through then tail blocks, joined
+    CHUNK_SIZE characters at a time."""
+    sizes = [block.count("\n") + 1 for block in body]
+    total = sum(block.count("\n") + 1 for block in head + tail)
+
+    chunk, length = list(head), 0
+    for count, (block, size) in enumerate(itertools.cycle(zip(body, sizes))):
+        # At least one body record, a valid file needs it
+        if count and total + size > lines:
+            break
+        total += size
+        chunk.append(block)
+        length += len(block)
+        if length >= CHUNK_SIZE:
+            yield "\n".join(chunk)
+            chunk, length = [], 0
+
+    chunk += tail
+    if chunk:
+        yield "\n".join(chunk)
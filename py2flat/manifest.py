@@ -0,0 +1,166 @@
+"""Manifest of the files already parsed by read_dir.
+
+Each file path maps to its size, mtime and content hash, along with its
+parse result (results=True) or a mere done marker. Files whose size and
+mtime didn't change aren't read at all, others are hashed and only parsed
+again when their content changed. Everything is forgotten when the schema,
+the parse options or the library version change.
+
+The manifest is a JSON file, results are pickled next to it in a
+".d" directory.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+from dataclasses import dataclass, field
+from typing import Any
+
+from py2flat import __version__
+from py2flat.utils import atomic_write
+
+_logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1 << 20
+
+
+def file_hash(filepath: str) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest_key(schema: str, options: dict) -> str:
+    """What parse results depend on: the schema JSON, the parse options
+    (collectors such as stats excluded) and the library version."""
+    options = {
+        name: value
+        for name, value in options.items()
+        if isinstance(value, (str, int, float, bool, type(None)))
+    }
+    digest = hashlib.sha256(schema.encode())
+    digest.update(json.dumps(options, sort_keys=True).encode())
+    digest.update(__version__.encode())
+    return digest.hexdigest()
+
+
+@dataclass(kw_only=True)
+class Manifest:
+    filepath: str
+    results: bool = False  # keep parse results, done markers otherwise
+    key: str = None
+    entries: dict[str, dict] = field(default_factory=dict)
+    # Fingerprints of the files found changed, recorded once parsed
+    _changed: dict[str, dict] = field(default_factory=dict, repr=False)
+
+    @property
+    def directory(self) -> str:
+        return f"{self.filepath}.d"
+
+    @classmethod
+    def load(cls, filepath: str, results: bool = False) -> "Manifest":
+        """Saved manifest, an empty one when filepath doesn't exist."""
+        manifest = cls(filepath=filepath, results=results)
+        if os.path.exists(filepath):
+            with open(filepath, encoding="utf-8") as file:
+                content = json.load(file)
+            manifest.key = content["key"]
+            manifest.entries = content["entries"]
+        return manifest
+
+    def save(self) -> None:
+        content = {"key": self.key, "entries": self.entries}
+        atomic_write(self.filepath, json.dumps(content, indent=1).encode())
+
+        # Results of changed or removed files
+        if os.path.isdir(self.directory):
+            kept = {f"{entry['hash']}.pickle" for entry in self.entries.values()}
+            for filename in os.listdir(self.directory):
+                if filename not in kept:
+                    os.remove(os.path.join(self.directory, filename))
+
+    def bind(self, key: str) -> None:
+        """Forget everything parsed under another key."""
+        if key == self.key:
+            return
+        if self.entries:
+            _logger.info("Schema or options changed, reset manifest %s", self.filepath)
+        self.key, self.entries = key, {}
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def changed(self, filepath: str) -> bool:
+        """Whether filepath is new or its content changed since recorded."""
+        path = os.path.abspath(filepath)
+        stat = os.stat(path)
+        entry = self.entries.get(path)
+        fingerprint = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+        if self.results and entry is not None:
+            # Recorded without its result
+            if not os.path.exists(self._result_path(entry)):
+                entry = None
+
+        if entry is not None and all(
+            entry[name] == value for name, value in fingerprint.items()
+        ):
+            return False
+
+        fingerprint["hash"] = file_hash(path)
+        if (
+            entry is not None
+            and entry["hash"] == fingerprint["hash"]
+            and entry["size"] == fingerprint["size"]
+        ):
+            # Touched only
+            entry.update(fingerprint)
+            return False
+
+        self._changed[path] = fingerprint
+        return True
+
+    def _result_path(self, entry: dict) -> str:
+        return os.path.join(self.directory, f"{entry['hash']}.pickle")
+
+    def record(self, filepath: str, result: Any) -> None:
+        """Mark filepath as parsed, along with its result."""
+        path = os.path.abspath(filepath)
+        entry = self._changed.pop(path, None) or {
+            "size": os.stat(path).st_size,
+            "mtime": os.stat(path).st_mtime_ns,
+            "hash": file_hash(path),
+        }
+        if self.results:
+            atomic_write(
+                self._result_path(entry),
+                pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL),
+            )
+        self.entries[path] = entry
+
+    def result(self, filepath: str) -> Any:
+        """Cached result of an unchanged file (results=True)."""
+        entry = self.entries[os.path.abspath(filepath)]
+        with open(self._result_path(entry), "rb") as file:
+            return pickle.load(file)
+
+    def owns(self, filepath: str) -> bool:
+        """Whether filepath is the manifest or one of its results, when kept
+        in the parsed directory."""
+        path = os.path.abspath(filepath)
+        return path == os.path.abspath(self.filepath) or path.startswith(
+            os.path.join(os.path.abspath(self.directory), "")
+        )
+
+    def prune(self, path: str, filepaths: list[str]) -> None:
+        """Forget files under path that are gone."""
+        directory = os.path.join(os.path.abspath(path), "")
+        found = {os.path.abspath(filepath) for filepath in filepaths}
+        for name in [
+            name
+            for name in self.entries
+            if name.startswith(directory) and name not in found
+        ]:
+            del self.entries[name]
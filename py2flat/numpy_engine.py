@@ -0,0 +1,352 @@
+"""Vectorized parsing engine, used when NumPy is installed.
+
+Each segment is mapped to a structured dtype of fixed-width byte fields and
+whole columns are converted at once. Only the happy path is handled here:
+whenever something looks wrong (short line, orphan child, missing value...)
+the engine gives up and the Python path parses the content again, raising
+the exact same errors as usual.
+"""
+import logging
+from array import array
+
+from py2flat.converters import BaseDate, BaseFloat, BaseInteger, Converter
+from py2flat.plans import SegmentPlan
+from py2flat.utils import PARENT_COLUMN
+
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+except ImportError:  # pragma: no cover
+    np = None
+
+_logger = logging.getLogger(__name__)
+
+# Longest digit run converted with vectorized arithmetic (exact in float64)
+MAX_DIGITS = 15
+
+SPACE = ord(" ")
+LINE_FEED = ord("\n")
+CARRIAGE_RETURN = ord("\r")
+
+
+def available() -> bool:
+    return np is not None
+
+
+def segment_dtype(plan: SegmentPlan) -> "np.dtype":
+    """Structured dtype of fixed-width byte fields matching a segment."""
+    return np.dtype(
+        {
+            "names": list(plan.names),
+            "formats": [f"S{element.size}" for element in plan.segment.elements],
+            "offsets": list(plan.offsets),
+            "itemsize": plan.size,
+        }
+    )
+
+
+def _split(data: "np.ndarray") -> tuple["np.ndarray", "np.ndarray"]:
+    """Return starts and lengths of non-empty lines."""
+    ends = np.flatnonzero(data == LINE_FEED)
+    if data.size and data[-1] != LINE_FEED:
+        ends = np.append(ends, data.size)
+
+    starts = np.zeros_like(ends)
+    starts[1:] = ends[:-1] + 1
+
+    filled = ends > starts
+    carriage = np.zeros(ends.size, dtype=bool)
+    carriage[filled] = data[ends[filled] - 1] == CARRIAGE_RETURN
+
+    lengths = ends - starts - carriage
+    keep = lengths > 0
+    return starts[keep], lengths[keep]
+
+
+def _identifiers(
+    data: "np.ndarray", starts: "np.ndarray", lengths: "np.ndarray", size: int
+) -> "np.ndarray":
+    """First bytes of each line, shorter lines are padded with NUL."""
+    index = np.arange(size)
+    chars = data[np.minimum(starts[:, None] + index, data.size - 1)]
+    chars[index >= lengths[:, None]] = 0
+    return np.ascontiguousarray(chars).view(f"S{size}").ravel()
+
+
+def _records(
+    buffer, data: "np.ndarray", starts: "np.ndarray", plan: SegmentPlan, uniform: bool
+) -> "np.ndarray":
+    dtype = segment_dtype(plan)
+
+    if uniform:
+        # Fixed-record content: read the buffer in place, one record per line
+        stride = int(starts[1] - starts[0]) if starts.size > 1 else plan.size
+        return np.ndarray(
+            shape=(starts.size,),
+            dtype=dtype,
+            buffer=buffer,
+            offset=int(starts[0]),
+            strides=(stride,),
+        )
+
+    rows = sliding_window_view(data, plan.size)[starts]
+    return rows.view(dtype).ravel()
+
+
+def _integers(raw: "np.ndarray") -> tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """Vectorized int() of justified digit fields.
+
+    Return values, rows that could be converted and blank rows."""
+    width = raw.dtype.itemsize
+    chars = np.ascontiguousarray(raw).view(np.uint8).reshape(raw.size, width)
+
+    digits = (chars >= ord("0")) & (chars <= ord("9"))
+    count = digits.sum(axis=1)
+    first = digits.argmax(axis=1)
+    last = width - 1 - digits[:, ::-1].argmax(axis=1)
+
+    valid = (
+        (digits | (chars == SPACE)).all(axis=1)
+        & (count <= MAX_DIGITS)
+        & ((count == 0) | (last - first + 1 == count))
+    )
+
+    values = np.zeros(raw.size, dtype=np.int64)
+    for column in range(width):
+        values = np.where(
+            digits[:, column], values * 10 + (chars[:, column] - ord("0")), values
+        )
+
+    return values, valid, count == 0
+
+
+def _floats(raw: "np.ndarray") -> tuple["np.ndarray", "np.ndarray"] | None:
+    """Vectorized BaseFloat input, return values and blank rows."""
+    stripped = np.char.strip(raw)
+    blank = stripped == b""
+    try:
+        values = np.where(blank, b"0", np.char.replace(stripped, b",", b"."))
+        return values.astype(np.float64), blank
+    except ValueError:
+        return None
+
+
+def _decode(decoder, raw: "np.ndarray") -> list:
+    items = raw.tolist()
+    values = {item: decoder(item.decode()) for item in set(items)}
+    return list(map(values.__getitem__, items))
+
+
+def _dates(converter, default, raw: "np.ndarray") -> list:
+    items = [item.decode().strip() for item in raw.tolist()]
+    filled = [item for item in items if item]
+    values = iter(converter.input_many(filled))
+    return [next(values) if item else default for item in items]
+
+
+def _column(element, decoder, raw: "np.ndarray") -> list:
+    converter = Converter.by_name(element.converter) if element.converter else None
+
+    if element.ttype == "str" and converter is None:
+        # Values repeat a lot in flat files: decode each distinct one once
+        default = element.default
+        items = raw.tolist()
+        values = {item: item.decode().strip() or default for item in set(items)}
+        return list(map(values.__getitem__, items))
+
+    if element.ttype == "str" and issubclass(converter, BaseFloat):
+        res = _floats(raw)
+        if res is None:
+            return _decode(decoder, raw)
+
+        values, blank = res
+        column = values.tolist()
+        for index in np.flatnonzero(blank).tolist():
+            column[index] = element.default
+        return column
+
+    if element.ttype == "str" and issubclass(converter, BaseDate):
+        try:
+            return _dates(converter, element.default, raw)
+        except ValueError:
+            return _decode(decoder, raw)
+
+    if element.ttype == "int" and (
+        converter is None or issubclass(converter, BaseInteger)
+    ):
+        values, valid, blank = _integers(raw)
+        if converter is None:
+            column = values.tolist()
+        else:
+            column = (values / converter._multiplier).tolist()
+
+        for index in np.flatnonzero(blank).tolist():
+            column[index] = element.default
+        for index in np.flatnonzero(~valid).tolist():
+            column[index] = decoder(raw[index].decode())
+        return column
+
+    return _decode(decoder, raw)
+
+
+def _nest(schema, columns: dict, parents: dict, order: list) -> dict:
+    """Turn columns back into nested records, as the Python path does."""
+    rows = {}
+    for name in order:
+        plan = schema.plans[schema.by_name[name].identifier]
+        values = [columns[name][column] for column in plan.names]
+        rows[name] = [
+            plan.asdict(list(row), skip=schema.skip_null_value) for row in zip(*values)
+        ]
+
+    for name, (parent, index) in parents.items():
+        seg = schema.by_name[name]
+        for row, position in zip(rows[name], index.tolist()):
+            target = rows[parent][position]
+            target.setdefault(name, [] if seg.multiple else {})
+            if seg.multiple:
+                target[name].append(row)
+            else:
+                target[name].update(row)
+
+    data = {}
+    for name in order:
+        seg = schema.by_name[name]
+        if seg.parent:
+            continue
+        if seg.multiple:
+            data[name] = rows[name]
+        else:
+            data[name] = {}
+            for row in rows[name]:
+                data[name].update(row)
+
+    return data
+
+
+def read(schema, buffer, layout: str = "nested") -> dict | None:
+    """Parse buffer with NumPy, None means the Python path must be used."""
+    if np is None:
+        return None
+
+    try:
+        return _read(schema, buffer, layout)
+    except Exception as error:  # pylint: disable=broad-except
+        _logger.debug("NumPy engine fallback: %s", error)
+        return None
+
+
+def _route(dispatcher, data, starts, lengths) -> "np.ndarray":
+    """Index of each line's plan in dispatcher.plans, -1 for unknown lines."""
+    owners = np.full(starts.size, -1)
+    for size in dispatcher.sizes:
+        prefixes = _identifiers(data, starts, lengths, size)
+        for number, key in enumerate(dispatcher.plans):
+            owners[(owners < 0) & (prefixes == key)] = number
+    return owners
+
+
+def _read(schema, buffer, layout: str) -> dict | None:
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    starts, lengths = _split(data)
+
+    dispatcher = schema.dispatcher
+    plans = list(dispatcher.plans.values())
+    owners = _route(dispatcher, data, starts, lengths)
+
+    unknown = owners < 0
+    identifiers = {
+        plans[number].segment.identifier for number in np.unique(owners[~unknown])
+    }
+    if unknown.any():
+        prefixes = _identifiers(
+            data, starts[unknown], lengths[unknown], dispatcher.sizes[0]
+        )
+        identifiers |= {item.decode() for item in np.unique(prefixes).tolist()}
+    schema._validate(identifiers)
+
+    uniform = starts.size > 1 and bool((np.diff(starts) == starts[1] - starts[0]).all())
+
+    # Row of each line within its segment
+    positions = np.zeros(starts.size, dtype=np.int64)
+
+    columns, present = {}, []
+    for number, plan in enumerate(plans):
+        lines = np.flatnonzero(owners == number)
+        if not lines.size:
+            continue
+
+        if (lengths[lines] < plan.size).any():
+            return None
+
+        records = _records(
+            buffer, data, starts[lines], plan, uniform and lines.size == starts.size
+        )
+        values = [
+            _column(element, decoder, records[name])
+            for name, element, decoder in zip(
+                plan.names, plan.segment.elements, plan.decoders
+            )
+        ]
+
+        for index in plan.required:
+            if not all(values[index]):
+                return None
+
+        positions[lines] = np.arange(lines.size)
+        columns[plan.name] = dict(zip(plan.names, values))
+        present.append(number)
+
+    # Children belong to the last top-level line before them,
+    # the trailing False maps unknown lines (-1) to "not top-level"
+    top = np.array([not plan.segment.parent for plan in plans] + [False])
+    is_top = top[owners]
+    last = np.maximum.accumulate(np.where(is_top, np.arange(starts.size), -1))
+
+    numbers = {plans[number].name: number for number in present}
+    parents = {}
+    for number in present:
+        plan = plans[number]
+        if not plan.segment.parent:
+            continue
+
+        lines = np.flatnonzero(owners == number)
+        parent_lines = last[lines]
+        if (parent_lines < 0).any():
+            return None
+
+        parent_owners = np.unique(owners[parent_lines])
+        if parent_owners.size != 1:
+            return None
+
+        index = positions[parent_lines]
+        parents[plan.name] = (plans[parent_owners[0]].name, index)
+
+        if layout == "columns":
+            # Rows of the declared parent, within the same top-level record
+            parent = numbers.get(plan.segment.parent)
+            if parent is None:
+                return None
+            declared = np.maximum.accumulate(
+                np.where(owners == parent, np.arange(starts.size), -1)
+            )[lines]
+            if (declared < parent_lines).any():
+                return None
+            columns[plan.name][PARENT_COLUMN] = positions[declared]
+
+    # Keep segments in order of appearance
+    first = {plans[number].name: int(np.argmax(owners == number)) for number in present}
+    order = sorted(first, key=first.get)
+
+    if layout == "columns":
+        return _columns(columns, order)
+    return _nest(schema, columns, parents, order)
+
+
+def _columns(columns: dict, order: list) -> dict:
+    data = {}
+    for name in order:
+        data[name] = columns[name]
+        if PARENT_COLUMN in data[name]:
+            data[name][PARENT_COLUMN] = array("q", data[name][PARENT_COLUMN].tolist())
+    return data
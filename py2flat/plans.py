@@ -0,0 +1,178 @@
+# pylint: disable=R0902
+import struct
+from dataclasses import dataclass, field
+from typing import Callable, NamedTuple
+
+from py2flat.records import Record, record_class
+from py2flat.segment import Segment
+
+
+@dataclass(kw_only=True, eq=False)
+class SegmentPlan:
+    """Decode plan compiled once per segment when the schema loads."""
+
+    segment: Segment
+    size: int = 0
+    offsets: tuple[int, ...] = ()
+    names: tuple[str, ...] = ()
+    required: tuple[int, ...] = ()
+    decoders: tuple[Callable, ...] = ()
+    unpacker: struct.Struct = field(default=None, repr=False)
+    children: list[str] = field(default_factory=list)
+    record_class: type = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        elements = self.segment.elements
+        offsets, offset = [], 0
+        for element in elements:
+            offsets.append(offset)
+            offset += element.size
+
+        self.size = offset
+        self.offsets = tuple(offsets)
+        self.names = tuple(element.name for element in elements)
+        self.required = tuple(
+            index for index, element in enumerate(elements) if element.required
+        )
+        self.decoders = tuple(element.compile() for element in elements)
+        self.unpacker = struct.Struct(self.segment.fieldwidths)
+
+    def __getstate__(self) -> dict:
+        # struct.Struct can't be pickled, keep its format only
+        state = vars(self).copy()
+        state["unpacker"] = self.unpacker.format
+        # Generated classes are rebuilt on demand
+        state["record_class"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        state["unpacker"] = struct.Struct(state["unpacker"])
+        vars(self).update(state)
+
+    @property
+    def name(self) -> str:
+        return self.segment.name
+
+    def unpack(self, buffer: bytes) -> list[str]:
+        return [item.decode() for item in self.unpacker.unpack_from(buffer)]
+
+    def decode(self, buffer: bytes) -> list:
+        """Split and parse a whole line in one go."""
+        return [
+            decode(item.decode())
+            for decode, item in zip(self.decoders, self.unpacker.unpack_from(buffer))
+        ]
+
+    def record(self, line: bytes) -> Record:
+        """Lazy record over a raw line."""
+        if self.record_class is None:
+            self.record_class = record_class(self, self.children)
+        return self.record_class(line)
+
+    def missing(self, values: list) -> list[str]:
+        return [self.names[index] for index in self.required if not values[index]]
+
+    def asdict(self, values: list, skip: bool = False) -> dict:
+        if skip:
+            return {name: value for name, value in zip(self.names, values) if value}
+        return dict(zip(self.names, values))
+
+
+@dataclass(kw_only=True)
+class Dispatcher:
+    """Route raw lines to their compiled segment.
+
+    Plans are keyed by raw identifier bytes, line prefixes of each size
+    are looked up longest first."""
+
+    plans: dict[bytes, SegmentPlan]
+    sizes: tuple[int, ...]
+
+    @classmethod
+    def from_plans(cls, plans: list[SegmentPlan], size: int = None) -> "Dispatcher":
+        """Fixed size prefixes when size is given, identifier lengths otherwise."""
+        keys = {
+            plan.segment.identifier.encode(): plan
+            for plan in plans
+            if plan.segment.identifier is not None
+        }
+        sizes = (
+            (size,) if size else tuple(sorted({len(key) for key in keys}, reverse=True))
+        )
+        return cls(plans=keys, sizes=sizes)
+
+    def route(self, line: bytes) -> SegmentPlan | None:
+        for size in self.sizes:
+            plan = self.plans.get(line[:size])
+            if plan is not None:
+                return plan
+        return None
+
+    def identifier(self, line: bytes) -> str:
+        """Identifier of an unknown line, as reported by validation."""
+        return str(line[: self.sizes[0]], "utf-8") if self.sizes else ""
+
+
+class EncodedSegment(NamedTuple):
+    name: str
+    line: str
+
+
+@dataclass(kw_only=True, eq=False)
+class SegmentEncoder:
+    """Encode plan compiled once per segment when the schema loads."""
+
+    segment: Segment
+    fill: str
+    transliteration: str
+    name: str = None
+    names: tuple[str, ...] = ()
+    known: frozenset[str] = frozenset()
+    encoders: tuple[Callable, ...] = ()
+    children: list["SegmentEncoder"] = field(default_factory=list, repr=False)
+    nested: frozenset[str] = frozenset()
+
+    def __post_init__(self) -> None:
+        elements = self.segment.elements
+        self.name = self.segment.name
+        self.names = tuple(element.name for element in elements)
+        self.known = frozenset(self.names)
+        self.encoders = tuple(
+            element.encoder(self.fill, self.transliteration) for element in elements
+        )
+
+    def add_child(self, child: "SegmentEncoder") -> None:
+        self.children.append(child)
+        self.nested = self.nested | {child.name}
+
+    def encode(self, vals: dict) -> str:
+        """Fixed-width line from values, missing ones get their default."""
+        if not self.known.issuperset(vals):
+            raise KeyError(", ".join(sorted(vals.keys() - self.known)))
+
+        get = vals.get
+        return "".join(
+            [encode(get(name)) for name, encode in zip(self.names, self.encoders)]
+        )
+
+    def encode_all(self, vals: dict, res: list[EncodedSegment]) -> None:
+        """Append the record then its children, following schema order."""
+        nested = None
+        if self.children and not self.nested.isdisjoint(vals):
+            nested = vals
+            vals = {key: value for key, value in vals.items() if key not in self.nested}
+
+        res.append(EncodedSegment(self.name, self.encode(vals)))
+
+        if nested is None:
+            return
+
+        for child in self.children:
+            if child.name not in nested:
+                continue
+            values = nested[child.name]
+            if child.segment.multiple and isinstance(values, list):
+                for child_vals in values:
+                    child.encode_all(child_vals, res)
+            else:
+                child.encode_all(values, res)
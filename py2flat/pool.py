@@ -0,0 +1,93 @@
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Generator
+
+from py2flat.errors import Errors
+from py2flat.stats import Stats
+
+if TYPE_CHECKING:
+    from py2flat.schemas import Schema
+
+# Chunks in flight per worker, more are submitted as results are yielded
+WINDOW = 2
+
+# Schema shipped once to each worker process by the pool initializer
+_schema = None
+
+
+def _init_worker(schema: "Schema") -> None:
+    global _schema  # pylint: disable=global-statement
+    _schema = schema
+
+
+def _read_chunk(
+    filepaths: list[str], options: dict, stats: Stats = None, errors: Errors = None
+) -> tuple[list[tuple[str, dict]], Stats | None, Errors | None]:
+    # Empty collectors are filled per chunk and merged back by the parent
+    # process
+    res = [
+        (filepath, _schema.read_file(filepath, stats=stats, errors=errors, **options))
+        for filepath in filepaths
+    ]
+    return res, stats, errors
+
+
+def read_files(
+    schema: "Schema",
+    filepaths: list[str],
+    jobs: int = None,
+    chunksize: int = 16,
+    ordered: bool = True,
+    **options,
+) -> Generator[tuple[str, dict], Any, Any]:
+    """Parse files in a process pool, yield (filepath, result) pairs.
+    Options are passed to read_file, stats and errors collected by workers
+    are merged into options["stats"] and options["errors"].
+
+    At most WINDOW chunks per worker are submitted ahead of the consumer,
+    results of a slow consumer don't pile up in memory."""
+
+    stats = options.pop("stats", None)
+    errors = options.pop("errors", None)
+    chunksize = max(chunksize, 1)
+    chunks = (
+        filepaths[index : index + chunksize]
+        for index in range(0, len(filepaths), chunksize)
+    )
+
+    executor = ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(schema,)
+    )
+
+    def submit(chunks):
+        return [
+            executor.submit(
+                _read_chunk,
+                chunk,
+                options,
+                Stats() if stats is not None else None,
+                errors.spawn() if errors is not None else None,
+            )
+            for chunk in chunks
+        ]
+
+    try:
+        pending = deque(submit(islice(chunks, WINDOW * (jobs or os.cpu_count() or 1))))
+        while pending:
+            if ordered:
+                future = pending.popleft()
+            else:
+                future = next(iter(wait(pending, return_when=FIRST_COMPLETED).done))
+                pending.remove(future)
+
+            res, collected, failed = future.result()
+            if collected is not None:
+                stats.merge(collected)
+            if failed is not None:
+                errors.merge(failed)
+            pending.extend(submit(islice(chunks, 1)))
+            yield from res
+    finally:
+        executor.shutdown(cancel_futures=True)
@@ -0,0 +1,136 @@
+"""Lazy records: one __slots__ class generated per segment.
+
+A record keeps the raw line and decodes an element only when it is first
+accessed, the value is then cached in a slot and flagged in a bitmask.
+Generated classes can't be pickled, records are pickled as their plan and
+raw line and rebuilt (undecoded) from them.
+"""
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from py2flat.plans import SegmentPlan
+
+
+class LazyField:
+    """Decode an element from the raw line on first access."""
+
+    __slots__ = ("slot", "bit", "start", "stop", "decode")
+
+    def __init__(
+        self, slot: Any, bit: int, start: int, stop: int, decode: Callable
+    ) -> None:
+        self.slot = slot
+        self.bit = bit
+        self.start = start
+        self.stop = stop
+        self.decode = decode
+
+    def __get__(self, record: "Record", owner: type = None) -> Any:
+        if record is None:
+            return self
+
+        if record._decoded & self.bit:
+            return self.slot.__get__(record, owner)
+
+        value = self.decode(str(record._line[self.start : self.stop], "utf-8"))
+        self.slot.__set__(record, value)
+        record._decoded |= self.bit
+        return value
+
+
+class ChildField:
+    """Children records attached to a record."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __get__(self, record: "Record", owner: type = None) -> Any:
+        if record is None:
+            return self
+        return record._children.get(self.name) if record._children else None
+
+
+class Record:
+    """Base class of generated records."""
+
+    __slots__ = ("_line", "_children", "_decoded")
+
+    _names = ()
+    _plan = None
+
+    def __init__(self, line: bytes) -> None:
+        self._line = line
+        self._children = None
+        self._decoded = 0
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self._names:
+            return getattr(self, name)
+        if self._children and name in self._children:
+            return self._children[name]
+        raise KeyError(name)
+
+    def __reduce__(self) -> tuple:
+        return _rebuild, (self._plan, bytes(self._line), self._children)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {bytes(self._line)!r}>"
+
+    def attach(self, name: str, record: "Record", multiple: bool = False) -> None:
+        if self._children is None:
+            self._children = {}
+
+        if multiple:
+            self._children.setdefault(name, []).append(record)
+        else:
+            self._children[name] = record
+
+    def asdict(self, skip: bool = False) -> dict:
+        """Decode every element, children included."""
+        values = {name: getattr(self, name) for name in self._names}
+        if skip:
+            values = {name: value for name, value in values.items() if value}
+
+        for name, children in (self._children or {}).items():
+            if isinstance(children, list):
+                values[name] = [child.asdict(skip=skip) for child in children]
+            else:
+                values[name] = children.asdict(skip=skip)
+
+        return values
+
+
+def _rebuild(plan: "SegmentPlan", line: bytes, children: dict | None) -> Record:
+    record = plan.record(line)
+    record._children = children
+    return record
+
+
+def record_class(plan: "SegmentPlan", children: list[str] = ()) -> type:
+    """Generate the record class of a segment, children names get an
+    attribute too."""
+    slots = tuple(f"_{index}" for index in range(len(plan.names)))
+    cls = type(
+        f"{plan.name}Record",
+        (Record,),
+        {
+            "__slots__": slots,
+            "_names": plan.names,
+            "_plan": plan,
+        },
+    )
+
+    for index, name in enumerate(plan.names):
+        start = plan.offsets[index]
+        stop = start + plan.segment.elements[index].size
+        slot = cls.__dict__[slots[index]]
+        setattr(
+            cls, name, LazyField(slot, 1 << index, start, stop, plan.decoders[index])
+        )
+
+    for name in children:
+        setattr(cls, name, ChildField(name))
+
+    return cls
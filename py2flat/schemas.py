@@ -1,18 +1,128 @@
 # pylint: disable=R0902
-import copy
+import io
 import json
 import logging
+import mmap
 import os
-import struct
+from array import array
+from collections import Counter
+from contextlib import ExitStack, suppress
 from dataclasses import dataclass, field
-from typing import Any, Generator, List, Literal
-
+from functools import partial
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    BinaryIO,
+    Callable,
+    Generator,
+    Iterable,
+    List,
+    Literal,
+)
+
+from py2flat.errors import Errors, locate
+from py2flat.exceptions import ErrorBudgetExceeded, RequiredElementMissing
+from py2flat.plans import Dispatcher, EncodedSegment, SegmentEncoder, SegmentPlan
 from py2flat.segment import Segment
-from py2flat.utils import DEFAULT_SEPARATOR
+from py2flat.stats import Stats
+from py2flat.tail import Checkpoint
+from py2flat.utils import (
+    DEFAULT_BATCH,
+    DEFAULT_SEPARATOR,
+    DEFAULT_TRANSLITERATION,
+    PARENT_COLUMN,
+)
+
+# Process pools and manifests (pickle, hashlib) are imported when used only,
+# they would weigh on every startup
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from py2flat.manifest import Manifest
 
 _logger = logging.getLogger(__name__)
 
 
+def _iter_lines(fileobj: BinaryIO) -> Generator[bytes, None, None]:
+    for line in fileobj:
+        yield line.rstrip(b"\r\n")
+
+
+def _iter_offsets(fileobj: BinaryIO) -> Generator[tuple[int, bytes], None, None]:
+    """Lines along with the byte offset they start at."""
+    offset = 0
+    for line in fileobj:
+        yield offset, line.rstrip(b"\r\n")
+        offset += len(line)
+
+
+def _iter_buffer(buffer: bytes | mmap.mmap) -> Generator[memoryview, None, None]:
+    """Locate lines in buffer and yield them as zero-copy slices."""
+    view = memoryview(buffer)
+    start, end = 0, len(buffer)
+
+    while start < end:
+        stop = buffer.find(b"\n", start)
+        if stop == -1:
+            stop = end
+        following = stop + 1
+
+        if stop > start and buffer[stop - 1] == 13:  # \r
+            stop -= 1
+
+        yield view[start:stop]
+        start = following
+
+
+def _numpy_available() -> bool:
+    from py2flat import numpy_engine  # pylint: disable=import-outside-toplevel
+
+    return numpy_engine.available()
+
+
+def _list_files(path: str) -> list[str]:
+    filepaths = []
+    for root, _, files in os.walk(path, topdown=True):
+        filepaths += [os.path.join(root, file) for file in files]
+    return filepaths
+
+
+def _read_content(filepath: str) -> bytes:
+    with open(filepath, "rb") as file:
+        return file.read()
+
+
+def _attach(target: dict, seg: Segment, values: dict) -> None:
+    target.setdefault(seg.name, [] if seg.multiple else {})
+    if seg.multiple:
+        target[seg.name].append(values)
+    else:
+        target[seg.name].update(values)
+
+
+def _checked(plan: SegmentPlan, line: bytes, stats: Stats = None) -> list:
+    """Decode a line, raise wherever strict parsing fails."""
+    if len(line) < plan.size:
+        raise ValueError(
+            f"Line length is incorrect (actual:{len(line)} vs needed:{plan.size})."
+        )
+    values = plan.decode(line) if stats is None else stats.decode(plan, line)
+    missing = plan.missing(values)
+    if missing:
+        raise RequiredElementMissing(", ".join(missing))
+    return values
+
+
+def _close(record: list, raw: list, valid: bool | None, errors: Errors) -> list:
+    """Lines of a record once closed, none when it was rejected."""
+    if valid is False:
+        errors.reject(raw)
+        return []
+    return record
+
+
 @dataclass(kw_only=True)
 class Schema:
     name: str
@@ -21,12 +131,24 @@ class Schema:
     segments: list[Segment]
     by_identifier: dict = field(default_factory=dict)
     by_name: dict = field(default_factory=dict)
-    method: Literal["first-1", "first-3"] = "first-3"
+    plans: dict = field(default_factory=dict, repr=False)
+    dispatcher: Dispatcher = field(default=None, repr=False)
+    encoders: dict = field(default_factory=dict, repr=False)
+    method: Literal["first-1", "first-3", "prefix"] = "first-3"
     raise_if_unknown_segment: bool = False
     skip_null_value: bool = True
     fill: str = DEFAULT_SEPARATOR  # filling character
-
-    __exclude__ = ["segments", "by_identifier", "by_name"]
+    # text export: "unidecode" (ASCII), "ignore" (drop non-ASCII) or "none"
+    transliteration: Literal["unidecode", "ignore", "none"] = DEFAULT_TRANSLITERATION
+
+    __exclude__ = [
+        "segments",
+        "by_identifier",
+        "by_name",
+        "plans",
+        "dispatcher",
+        "encoders",
+    ]
 
     # def __repr__(self) -> str:
     #     return f"<Schema:{self.collection}> name='{self.name}' version='{self.version}'"
@@ -35,6 +157,24 @@ class Schema:
         self.segments = [Segment(**vals) for vals in self.segments]
         self.by_identifier = {seg.identifier: seg for seg in self.segments}
         self.by_name = {seg.name: seg for seg in self.segments}
+        self.plans = {seg.identifier: SegmentPlan(segment=seg) for seg in self.segments}
+        for seg in self.segments:
+            if seg.parent in self.by_name:
+                self.plans[self.by_name[seg.parent].identifier].children.append(
+                    seg.name
+                )
+        self.dispatcher = Dispatcher.from_plans(
+            self.plans.values(), size=self.identifier_size
+        )
+        self.encoders = {
+            seg.name: SegmentEncoder(
+                segment=seg, fill=self.fill, transliteration=self.transliteration
+            )
+            for seg in self.segments
+        }
+        for seg in self.segments:
+            if seg.parent:
+                self.encoders[seg.parent].add_child(self.encoders[seg.name])
 
     @property
     def relations(self):
@@ -61,27 +201,21 @@ class Schema:
         seg_identifiers = [seg.identifier for seg in self.segments]
         return list(set(identifiers).difference(set(seg_identifiers)))
 
-    def _unpack_identifier(self, lines):
+    @property
+    def identifier_size(self) -> int | None:
+        """Fixed identifier size, None when each segment identifier is used
+        as a prefix of its own length."""
         if self.method == "first-1":
-            fformat = "1s"
-        elif self.method == "first-3":
-            fformat = "3s"
-        else:
-            raise NotImplementedError(f"Unknow method '{self.method}'")
-
-        unpack = struct.Struct(fformat).unpack_from
-        return list(map(lambda s: s[0].decode(), map(unpack, lines)))
+            return 1
+        if self.method == "first-3":
+            return 3
+        if self.method == "prefix":
+            return None
+        raise NotImplementedError(f"Unknow method '{self.method}'")
 
-    def _parse(self, content: bytes) -> dict:
-        data = {}
-
-        # TODO: Find a better way to check and clean endline
-        lines = list(filter(bool, content.splitlines()))
+    def _validate(self, identifiers: set) -> None:
+        """End-of-stream checks on the identifiers met while parsing."""
 
-        # Before parsing the content, get all identifiers (first 3 letters in this case)
-        identifiers = self._unpack_identifier(lines)
-
-        # Compare identifiers
         #   1. required segments
         diff = self._compare_identifiers(identifiers, required_only=True)
         if diff:
@@ -93,128 +227,631 @@ class Schema:
         if self.raise_if_unknown_segment and diff:
             raise ValueError(f"Unknow segments: {diff}")
 
-        prev_seg = None
-        last_item = None
+    def _decode(
+        self,
+        lines: Iterable[bytes],
+        stats: Stats = None,
+        errors: Errors = None,
+        validate: bool = True,
+    ) -> Generator[tuple[SegmentPlan, list], None, None]:
+        """Unpack and parse lines one by one."""
+
+        if errors is not None:
+            yield from self._tolerant(lines, errors, stats)
+            return
+
+        for plan, line in self._route(lines, stats, validate):
+            values = plan.decode(line) if stats is None else stats.decode(plan, line)
+
+            # TODO: Is additional control really necessary?
+            missing = plan.missing(values)
+            if missing:
+                _logger.error("Missing values for: %s", ", ".join(missing))
+                raise ValueError("Missing required values.")
+
+            yield plan, values
+
+    def _route(
+        self, lines: Iterable[bytes], stats: Stats = None, validate: bool = True
+    ) -> Generator[tuple[SegmentPlan, bytes], None, None]:
+        """Pair each line with its compiled segment, identifiers are checked
+        at the end (unless validate is False, eg. for a part of a file)."""
+
+        route = self.dispatcher.route
+        seen, unknown = set(), set()
 
-        # Unpack values and parse
-        for identifier, line in zip(identifiers, lines):
-            if identifier not in self.by_identifier:
+        for line in lines:
+            if not line:
+                continue
+
+            # Get compiled segment according to its identifier
+            plan = route(line)
+            if stats is not None:
+                stats.count(plan and plan.name, len(line))
+            if plan is None:
                 # TODO: add a warning: skip line
+                unknown.add(self.dispatcher.identifier(line))
                 continue
 
-            # Get segment according to its identifier
-            seg = self.by_identifier[identifier]
+            seen.add(plan)
 
             # Compare line and segment length
-            if len(line) < seg.size:
-                _logger.warning(line)
+            if len(line) < plan.size:
+                _logger.warning(bytes(line))
                 raise ValueError(
-                    f"[{seg.name}] Line length is incorrect (actual:{len(line)} vs needed:{seg.size})."
+                    f"[{plan.name}] Line length is incorrect (actual:{len(line)} vs needed:{plan.size})."
                 )
 
-            values = seg.unpack(line)
-            _logger.debug("Raw values: %r", values)
-            values = seg.parse(values)
+            yield plan, line
 
-            # TODO: Is additional control really necessary?
-            if seg.check(values):
-                elements = ", ".join(seg.check(values))
-                _logger.error("Missing values for: %s", elements)
-                raise ValueError("Missing required values.")
+        if validate:
+            self._validate({plan.segment.identifier for plan in seen} | unknown)
+
+    def _tolerant(
+        self, lines: Iterable[tuple[int, bytes]], errors: Errors, stats: Stats = None
+    ) -> Generator[tuple[SegmentPlan, list], None, None]:
+        """_decode counterpart for (offset, line) pairs: invalid lines are
+        reported to errors and the top-level records holding them dropped."""
+
+        route = self.dispatcher.route
+        seen, unknown = set(), set()
+        # Lines of the current top-level record, valid is None until one opens
+        record, raw, valid = [], [], None
+
+        for number, (offset, line) in enumerate(lines, start=1):
+            if not line:
+                continue
+
+            plan = route(line)
+            if stats is not None:
+                stats.count(plan and plan.name, len(line))
+            if plan is None:
+                unknown.add(self.dispatcher.identifier(line))
+                continue
+
+            details = {"line": number, "offset": offset, "segment": plan.name}
+
+            if not plan.segment.parent:
+                # A new top-level line closes the previous record
+                done = _close(record, raw, valid, errors)
+                seen.update(item[0] for item in done)
+                yield from done
+                record, raw, valid = [], [], True
+            elif valid is None:
+                errors.add(
+                    value=str(line, "utf-8", "replace"),
+                    message="Orphan line",
+                    **details,
+                )
+                errors.reject([bytes(line)])
+                continue
+
+            if errors.quarantine:
+                raw.append(bytes(line))
 
-            values = seg.asdict(values, skip=self.skip_null_value)
+            try:
+                record.append((plan, _checked(plan, line, stats)))
+            except Exception as error:  # pylint: disable=broad-except
+                errors.add(**details, **locate(plan, line, error))
+                valid = False
+
+        done = _close(record, raw, valid, errors)
+        seen.update(item[0] for item in done)
+        yield from done
+
+        try:
+            self._validate({plan.segment.identifier for plan in seen} | unknown)
+        except ValueError as error:
+            errors.add(message=str(error))
+
+    def _records(
+        self,
+        lines: Iterable[bytes],
+        stats: Stats = None,
+        errors: Errors = None,
+        validate: bool = True,
+    ) -> Generator[tuple[str, dict], None, None]:
+        record = None
+        skip = self.skip_null_value
+
+        for plan, values in self._decode(lines, stats, errors, validate):
+            seg = plan.segment
+            if stats is None:
+                values = plan.asdict(values, skip=skip)
+            else:
+                values = stats.asdict(plan, values, skip=skip)
 
             # Nested lines
             if seg.parent:
-                if not prev_seg or not last_item:
+                if record is None:
                     raise ValueError("Orphan line")
 
-                if isinstance(last_item, list):
-                    last_item = last_item[-1]
+                _attach(record[1], seg, values)
+                continue
+
+            # A new top-level line closes the previous record
+            if record is not None:
+                yield record
+            record = (seg.name, values)
+
+        if record is not None:
+            yield record
+
+    def _parse(
+        self, lines: Iterable[bytes], stats: Stats = None, errors: Errors = None
+    ) -> dict:
+        data = {}
+
+        for name, values in self._records(lines, stats, errors):
+            _attach(data, self.by_name[name], values)
+
+        return data
+
+    def _columns(
+        self, lines: Iterable[bytes], stats: Stats = None, errors: Errors = None
+    ) -> dict:
+        """Build one column per element for each segment, children get a
+        parent column holding the row index of their parent segment."""
+        data = {}
+        appenders = {}
+        rows = Counter()
+        # Row index of the last line of each segment within the current record
+        last = {}
+
+        for plan, values in self._decode(lines, stats, errors):
+            seg = plan.segment
 
-                last_item.setdefault(seg.name, [] if seg.multiple else {})
-                if seg.multiple:
-                    last_item[seg.name].append(values)
-                else:
-                    last_item[seg.name].update(values)
+            if seg.name not in data:
+                columns = data[seg.name] = {name: [] for name in plan.names}
+                if seg.parent:
+                    columns[PARENT_COLUMN] = array("q")
+                appenders[seg.name] = [column.append for column in columns.values()]
+
+            append = appenders[seg.name]
+
+            if seg.parent:
+                if seg.parent not in last:
+                    raise ValueError("Orphan line")
+                append[-1](last[seg.parent])
             else:
-                data.setdefault(seg.name, [] if seg.multiple else {})
-                if seg.multiple:
-                    data[seg.name].append(values)
-                else:
-                    data[seg.name].update(values)
+                last.clear()
+            last[seg.name] = rows[seg.name]
+            rows[seg.name] += 1
 
-                # Define shortcuts to next iteration
-                prev_seg = seg
-                last_item = data[seg.name]
+            for append_value, value in zip(append, values):
+                append_value(value)
 
         return data
 
-    def __parse(self, content: bytes, silent: bool = False) -> dict:
+    def _lazy(self, lines: Iterable[bytes], stats: Stats = None) -> dict:
+        """Same structure as the nested layout, with lazy records."""
+        data = {}
+        record = None
+
+        for plan, line in self._route(lines, stats):
+            seg = plan.segment
+            item = plan.record(bytes(line))
+
+            # Required elements are decoded right away
+            missing = [
+                plan.names[index]
+                for index in plan.required
+                if not getattr(item, plan.names[index])
+            ]
+            if missing:
+                _logger.error("Missing values for: %s", ", ".join(missing))
+                raise ValueError("Missing required values.")
+
+            if seg.parent:
+                if record is None:
+                    raise ValueError("Orphan line")
+                record.attach(seg.name, item, multiple=seg.multiple)
+                continue
+
+            record = item
+            if seg.multiple:
+                data.setdefault(seg.name, []).append(item)
+            else:
+                data[seg.name] = item
+
+        return data
+
+    def _parser(self, layout: Literal["nested", "columns", "lazy"]) -> Callable:
+        if layout == "nested":
+            return self._parse
+        if layout == "columns":
+            return self._columns
+        if layout == "lazy":
+            return self._lazy
+        raise NotImplementedError(f"Unknow layout '{layout}'")
+
+    def _parse_vectorized(
+        self, buffer: bytes | mmap.mmap, layout: str, lines: Iterable[bytes]
+    ) -> dict:
+        # Imported on demand, NumPy alone doubles the startup time
+        from py2flat import numpy_engine  # pylint: disable=import-outside-toplevel
+
+        res = numpy_engine.read(self, buffer, layout) if layout != "lazy" else None
+        if res is None:
+            return self._parser(layout)(lines)
+        return res
+
+    def __parse(
+        self,
+        lines: Iterable[bytes],
+        silent: bool = False,
+        layout: Literal["nested", "columns", "lazy"] = "nested",
+        engine: Literal["python", "numpy"] = "python",
+        buffer: bytes | mmap.mmap = None,
+        stats: Stats = None,
+        errors: Errors = None,
+    ) -> dict:
+        if engine not in ("python", "numpy"):
+            raise NotImplementedError(f"Unknow engine '{engine}'")
+
+        # Stats and errors are collected along the Python path only,
+        # lines are then (offset, line) pairs
+        if errors is not None:
+            if layout == "lazy":
+                raise ValueError("Lazy records can't be checked while parsing.")
+            parse = partial(self._parser(layout), stats=stats, errors=errors)
+        elif engine == "numpy" and buffer is not None and stats is None:
+            parse = partial(self._parse_vectorized, buffer, layout)
+        elif stats is not None:
+            parse = partial(self._parser(layout), stats=stats)
+        else:
+            parse = self._parser(layout)
+
         if not silent:
-            return self._parse(content)
+            return parse(lines)
 
         try:
-            return self._parse(content)
+            return parse(lines)
+        except ErrorBudgetExceeded:
+            # Meant to stop the whole run, not a single file
+            raise
         except Exception as error:
             return {"error": str(error)}
 
-    def read_file(self, filepath: str, silent: bool = False) -> dict:
-        """Public method to parse content from filepath"""
+    def iter_records(
+        self, fileobj: BinaryIO, stats: Stats = None, errors: Errors = None
+    ) -> Generator[tuple[str, dict], None, None]:
+        """Read a binary file object incrementally and yield each completed
+        top-level record as (segment name, values), children included."""
+
+        if errors is not None:
+            return self._records(_iter_offsets(fileobj), stats, errors)
+        return self._records(_iter_lines(fileobj), stats)
+
+    def iter_values(
+        self, fileobj: BinaryIO, stats: Stats = None, errors: Errors = None
+    ) -> Generator[tuple[str, list], None, None]:
+        """Read a binary file object incrementally and yield each line as
+        (segment name, values in element order), children follow their
+        parent instead of being nested."""
+
+        lines = _iter_lines(fileobj) if errors is None else _iter_offsets(fileobj)
+        for plan, values in self._decode(lines, stats, errors):
+            yield plan.name, values
+
+    def _last_record(self, lines: list[bytes]) -> int:
+        """Index of the last top-level line."""
+        route = self.dispatcher.route
+        for index in range(len(lines) - 1, -1, -1):
+            plan = route(lines[index])
+            if plan is not None and not plan.segment.parent:
+                return index
+        return 0
+
+    def read_tail(
+        self, filepath: str, checkpoint: Checkpoint = None, final: bool = False
+    ) -> tuple[dict, Checkpoint]:
+        """Parse what was appended to filepath since checkpoint (the whole
+        file when None). Return the nested content of the records completed
+        since then, and the checkpoint to resume from.
+
+        The last top-level record stays pending, its children may still come,
+        until a following top-level line closes it or final is True. A
+        replaced or truncated file is read again from the start."""
         if not os.path.isfile(filepath):
             raise FileNotFoundError()
 
+        checkpoint = checkpoint or Checkpoint()
+        lines, offset = checkpoint.lines, checkpoint.offset
+
         with open(filepath, "rb") as file:
+            stat = os.fstat(file.fileno())
+            if checkpoint.inode not in (None, stat.st_ino) or stat.st_size < offset:
+                # The first line of the new file closes the pending record
+                offset = 0
+            file.seek(offset)
             content = file.read()
 
-        return self.__parse(content, silent=silent)
+        # A line still being written is left for the next run
+        end = len(content) if final else content.rfind(b"\n") + 1
+        lines += [bytes(line) for line in _iter_buffer(content[:end])]
+        split = len(lines) if final else self._last_record(lines)
+
+        data = {}
+        for name, values in self._records(lines[:split], validate=False):
+            _attach(data, self.by_name[name], values)
+
+        checkpoint = Checkpoint(offset=offset + end, inode=stat.st_ino)
+        checkpoint.lines = lines[split:]
+        return data, checkpoint
+
+    def read_file(
+        self,
+        filepath: str,
+        silent: bool = False,
+        memory_map: bool = False,
+        layout: Literal["nested", "columns", "lazy"] = "nested",
+        engine: Literal["python", "numpy"] = "python",
+        stats: Stats = None,
+        errors: Errors = None,
+    ) -> dict:
+        """Public method to parse content from filepath
+
+        engine="numpy" converts whole columns at once when NumPy is installed,
+        and falls back to the Python path otherwise (or when collecting
+        stats). With errors, invalid records are skipped and reported
+        instead of failing the whole file."""
+        if not os.path.isfile(filepath):
+            raise FileNotFoundError()
+
+        if stats is None and errors is None:
+            return self._read_file(filepath, silent, memory_map, layout, engine)
+
+        with ExitStack() as stack:
+            for collector in (stats, errors):
+                if collector is not None:
+                    stack.enter_context(collector.file(os.path.basename(filepath)))
+            return self._read_file(
+                filepath, silent, memory_map, layout, engine, stats, errors
+            )
+
+    def _read_file(
+        self,
+        filepath: str,
+        silent: bool,
+        memory_map: bool,
+        layout: Literal["nested", "columns", "lazy"],
+        engine: Literal["python", "numpy"],
+        stats: Stats = None,
+        errors: Errors = None,
+    ) -> dict:
+        options = {"silent": silent, "layout": layout, "engine": engine, "stats": stats}
+        vectorized = engine == "numpy" and stats is None and _numpy_available()
 
-    def read_str(self, content: str, silent: bool = False) -> dict:
+        with open(filepath, "rb") as file:
+            if errors is not None:
+                return self.__parse(_iter_offsets(file), errors=errors, **options)
+
+            # Empty files can't be mapped
+            if not memory_map or not os.fstat(file.fileno()).st_size:
+                if not vectorized:
+                    return self.__parse(_iter_lines(file), **options)
+
+                content = file.read()
+                return self.__parse(_iter_buffer(content), buffer=content, **options)
+
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                return self.__parse(_iter_buffer(buffer), buffer=buffer, **options)
+            finally:
+                # Slices may still be referenced by a traceback,
+                # the map is released along with them.
+                with suppress(BufferError):
+                    buffer.close()
+
+    def read_str(
+        self,
+        content: str,
+        silent: bool = False,
+        layout: Literal["nested", "columns", "lazy"] = "nested",
+        engine: Literal["python", "numpy"] = "python",
+        stats: Stats = None,
+        errors: Errors = None,
+    ) -> dict:
         """Public method to parse content from string"""
         if isinstance(content, str):
             content = bytes(content, "utf-8")
 
-        return self.__parse(content, silent=silent)
+        return self.read_bytes(
+            content,
+            silent=silent,
+            layout=layout,
+            engine=engine,
+            stats=stats,
+            errors=errors,
+        )
 
-    def read_bytes(self, content: bytes, silent: bool = False) -> dict:
+    def read_bytes(
+        self,
+        content: bytes,
+        silent: bool = False,
+        layout: Literal["nested", "columns", "lazy"] = "nested",
+        engine: Literal["python", "numpy"] = "python",
+        stats: Stats = None,
+        errors: Errors = None,
+    ) -> dict:
         """Public method to parse content from bytes"""
         if not isinstance(content, bytes):
             raise TypeError("Bytes needed.")
 
-        return self.__parse(content, silent=silent)
+        if errors is not None:
+            return self.__parse(
+                _iter_offsets(io.BytesIO(content)),
+                silent=silent,
+                layout=layout,
+                stats=stats,
+                errors=errors,
+            )
+
+        return self.__parse(
+            _iter_buffer(content),
+            silent=silent,
+            layout=layout,
+            engine=engine,
+            buffer=content,
+            stats=stats,
+        )
 
-    def read_dir(self, path: str, silent: bool = False) -> Generator[Any, Any, Any]:
+    def read_dir(
+        self,
+        path: str,
+        silent: bool = False,
+        jobs: int = 1,
+        chunksize: int = 16,
+        ordered: bool = True,
+        manifest: "Manifest" = None,
+        **options,
+    ) -> Generator[Any, Any, Any]:
+        """Parse every file found under path, yield (filename, result) pairs.
+
+        With jobs > 1 (or jobs=None for one worker per CPU), files are parsed
+        in a process pool, submitted by chunks of chunksize files. Unordered
+        results are yielded as soon as a chunk completes. With a manifest,
+        only new or changed files are parsed: unchanged ones are yielded
+        first from the manifest results, or skipped when it only keeps done
+        markers. Other options are passed to read_file."""
         if not os.path.exists(path):
             raise FileNotFoundError()
 
-        for root, _, files in os.walk(path, topdown=True):
-            filepaths = [os.path.join(root, file) for file in files]
+        filepaths = _list_files(path)
+
+        if manifest is not None:
+            # pylint: disable=import-outside-toplevel
+            from py2flat.manifest import manifest_key
+
+            filepaths = [path for path in filepaths if not manifest.owns(path)]
+            manifest.bind(manifest_key(self.json(), {"silent": silent, **options}))
+            manifest.prune(path, filepaths)
+
+            changed = []
+            for filepath in filepaths:
+                if manifest.changed(filepath):
+                    changed.append(filepath)
+                elif manifest.results:
+                    yield os.path.basename(filepath), manifest.result(filepath)
+            filepaths = changed
+
+        if jobs is None or jobs > 1:
+            from py2flat.pool import (  # pylint: disable=import-outside-toplevel
+                read_files,
+            )
+
+            results = read_files(
+                self,
+                filepaths,
+                jobs=jobs,
+                chunksize=chunksize,
+                ordered=ordered,
+                silent=silent,
+                **options,
+            )
+        else:
+            results = (
+                (filepath, self.read_file(filepath, silent=silent, **options))
+                for filepath in filepaths
+            )
+
+        try:
+            for filepath, res in results:
+                yield os.path.basename(filepath), res
+                # Once handed over, a file interrupted before isn't skipped,
+                # a failed one is parsed again next time
+                if manifest is not None and not (silent and set(res) == {"error"}):
+                    manifest.record(filepath, res)
+        finally:
+            if manifest is not None:
+                manifest.save()
+
+    async def aread_file(
+        self,
+        filepath: str,
+        silent: bool = False,
+        executor: "Executor" = None,
+        layout: Literal["nested", "columns", "lazy"] = "nested",
+    ) -> dict:
+        """Coroutine counterpart of read_file.
+
+        The file is read in a thread, parsing runs in executor (the loop's
+        default thread pool if not provided)."""
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        if not await asyncio.to_thread(os.path.isfile, filepath):
+            raise FileNotFoundError()
+
+        content = await asyncio.to_thread(_read_content, filepath)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, partial(self.read_bytes, content, silent=silent, layout=layout)
+        )
 
-        for filepath in filepaths:
-            yield os.path.basename(filepath), self.read_file(filepath, silent=silent)
+    async def aread_dir(
+        self,
+        path: str,
+        silent: bool = False,
+        limit: int = 16,
+        executor: "Executor" = None,
+        layout: Literal["nested", "columns", "lazy"] = "nested",
+    ) -> AsyncGenerator[tuple[str, dict], None]:
+        """Coroutine counterpart of read_dir, at most limit files are read at
+        once. Pairs are yielded as soon as each file is parsed, the next file
+        is only started once a result is handed over."""
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        if not await asyncio.to_thread(os.path.exists, path):
+            raise FileNotFoundError()
+
+        filepaths = iter(await asyncio.to_thread(_list_files, path))
 
-    def create_segment(self, identifier: str, vals: dict) -> List["Segment"]:
+        async def read(filepath: str) -> tuple[str, dict]:
+            res = await self.aread_file(
+                filepath, silent=silent, executor=executor, layout=layout
+            )
+            return os.path.basename(filepath), res
+
+        pending = {
+            asyncio.ensure_future(read(filepath))
+            for filepath in islice(filepaths, max(limit, 1))
+        }
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    for filepath in islice(filepaths, 1):
+                        pending.add(asyncio.ensure_future(read(filepath)))
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def create_segment(self, identifier: str, vals: dict) -> List[EncodedSegment]:
+        """Encode a record and its children, parent line first."""
         res = []
-        seg = self.by_name[identifier]
-        new_seg = copy.deepcopy(seg)
-
-        # Exclude children
-        relations = self.relations
-        if seg.name in relations:
-            children = {k: vals.pop(k) for k in relations[seg.name]}
-
-            for child, values in children.items():
-                child_seg = self.by_name[child]
-                if child_seg.multiple and isinstance(values, list):
-                    for child_vals in values:
-                        res += self.create_segment(child, child_vals)
-                else:
-                    res += self.create_segment(child, values)
-
-        new_seg.set_values(**vals)
-        res.insert(0, new_seg)
+        self.encoders[identifier].encode_all(vals, res)
         return res
 
+    def create_segments(
+        self, identifier: str, records: Iterable[dict], batch: int = DEFAULT_BATCH
+    ) -> Generator[List[EncodedSegment], Any, Any]:
+        """Encode records of the same segment, yield lists of encoded lines
+        (children included) every `batch` records."""
+        encode_all = self.encoders[identifier].encode_all
+        res = []
+        for count, vals in enumerate(records, start=1):
+            encode_all(vals, res)
+            if not count % batch:
+                yield res
+                res = []
+        if res:
+            yield res
+
     def json(self):
         vals = dict(
             filter(lambda item: item[0] not in self.__exclude__, vars(self).items())
@@ -5,7 +5,7 @@ from dataclasses import dataclass, field
 
 from py2flat.element import Element
 from py2flat.exceptions import ElementsNumberIncorrect
-from py2flat.utils import DEFAULT_SEPARATOR
+from py2flat.utils import DEFAULT_SEPARATOR, DEFAULT_TRANSLITERATION
 
 _logger = logging.getLogger(__name__)
 
@@ -80,8 +80,14 @@ class Segment:
         for key, value in vals.items():
             self.by_name[key].set_value(value)
 
-    def dump(self, fill: str = DEFAULT_SEPARATOR) -> str:
-        return "".join([element.dump(fill) for element in self.elements])
+    def dump(
+        self,
+        fill: str = DEFAULT_SEPARATOR,
+        transliteration: str = DEFAULT_TRANSLITERATION,
+    ) -> str:
+        return "".join(
+            [element.dump(fill, transliteration) for element in self.elements]
+        )
 
     def json(self):
         vals = dict(
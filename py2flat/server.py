@@ -0,0 +1,175 @@
+"""Long-running parse daemon over localhost HTTP.
+
+Schemas are compiled once and shipped to a pool of worker processes, each
+request only pays for its own parsing. JSON API:
+
+    GET  /schemas   names of loaded schemas
+    POST /parse     {"schema": name, "path": filepath} or {"content": text},
+                    optional "options" passed to read_file / read_str
+                    (see PARSE_OPTIONS)
+    POST /write     {"schema": name, "header": {...},
+                     "segments": [{"identifier": name, "values": {...}}]}
+
+Dates are sent as strings, in the element format or ISO. Responses hold
+"content" (or "error") and "elapsed", the server-side time
+in seconds, also sent as the X-Py2flat-Elapsed header.
+"""
+import json
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from py2flat.exceptions import Py2flatException
+from py2flat.exchange import Exchange
+from py2flat.schemas import Schema
+from py2flat.utils import DateTimeEncoder
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Parse options a request may set, with their allowed values. Lazy records
+# can't be sent back as JSON.
+PARSE_OPTIONS = {
+    "silent": (True, False),
+    "layout": ("nested", "columns"),
+    "engine": ("python", "numpy"),
+    "memory_map": (True, False),
+}
+
+# Schemas shipped once to each worker process by the pool initializer
+_schemas = {}
+
+
+def _init_worker(schemas: dict[str, Schema]) -> None:
+    global _schemas  # pylint: disable=global-statement
+    _schemas = schemas
+
+
+def _check_options(request: dict) -> None:
+    options = request.get("options", {})
+    if not isinstance(options, dict):
+        raise ValueError("Options must be an object.")
+    for name, value in options.items():
+        if name not in PARSE_OPTIONS:
+            raise ValueError(f"Unknow option '{name}'")
+        allowed = PARSE_OPTIONS[name]
+        # Booleans only for flags, 1 isn't True
+        if type(value) is not type(allowed[0]) or value not in allowed:
+            raise ValueError(f"Invalid value for option '{name}': {value!r}")
+    if "path" not in request and "memory_map" in options:
+        raise ValueError("Option 'memory_map' only applies to a path.")
+
+
+def _parse(name: str, request: dict) -> str:
+    schema = _schemas[name]
+    options = request.get("options", {})
+    if "path" in request:
+        content = schema.read_file(request["path"], **options)
+    else:
+        content = schema.read_str(request["content"], **options)
+    # Serialized here, the pool sends a single string back
+    return json.dumps(content, cls=DateTimeEncoder)
+
+
+def _write(name: str, request: dict) -> str:
+    exchange = Exchange(_schemas[name])
+    if request.get("header") is not None:
+        exchange.set_header(**request["header"])
+    for item in request.get("segments", []):
+        exchange.add_segment(item["identifier"], item["values"])
+    return json.dumps(exchange.dump())
+
+
+ACTIONS = {
+    "/parse": _parse,
+    "/write": _write,
+}
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    server: "Server"
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        _logger.debug(format, *args)
+
+    def _send(self, status: int, body: str, start: float) -> None:
+        elapsed = time.perf_counter() - start
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-Py2flat-Elapsed", f"{elapsed:.6f}")
+        self.end_headers()
+        self.wfile.write(data)
+        _logger.info("%s %s %s %.3fms", self.command, self.path, status, elapsed * 1e3)
+
+    def _error(self, status: int, message: str, start: float) -> None:
+        elapsed = time.perf_counter() - start
+        self._send(status, json.dumps({"error": message, "elapsed": elapsed}), start)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        start = time.perf_counter()
+        if self.path != "/schemas":
+            return self._error(404, f"Unknow path '{self.path}'", start)
+        return self._send(200, json.dumps(sorted(self.server.schemas)), start)
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        start = time.perf_counter()
+        action = ACTIONS.get(self.path)
+        if action is None:
+            return self._error(404, f"Unknow path '{self.path}'", start)
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            name = request["schema"]
+            if action is _parse:
+                _check_options(request)
+        except (ValueError, KeyError, TypeError) as error:
+            return self._error(400, f"Invalid request: {error}", start)
+
+        if name not in self.server.schemas:
+            return self._error(404, f"Unknow schema '{name}'", start)
+
+        try:
+            content = self.server.executor.submit(action, name, request).result()
+        except (Py2flatException, ValueError, KeyError, OSError) as error:
+            return self._error(400, str(error), start)
+        except Exception as error:  # pylint: disable=broad-except
+            _logger.exception("Request failed")
+            return self._error(500, str(error), start)
+
+        elapsed = time.perf_counter() - start
+        body = f'{{"content": {content}, "elapsed": {elapsed:.6f}}}'
+        return self._send(200, body, start)
+
+
+class Server(ThreadingHTTPServer):
+    """One thread per connection, parsing happens in the worker pool."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        schemas: dict[str, Schema],
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        workers: int = None,
+    ) -> None:
+        self.schemas = schemas
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(schemas,)
+        )
+        super().__init__((host, port), RequestHandler)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.executor.shutdown(cancel_futures=True)
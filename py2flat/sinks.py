@@ -0,0 +1,120 @@
+"""Per-segment CSV export.
+
+Each segment is written to its own file (Header.csv, Lines.csv, ...) with
+one column per element, after two synthetic ones: the row id, numbered per
+segment across every file written, and the id of the parent row, blank
+for top-level segments. Rows are written through the csv module as lines
+are decoded, files of any size stream through.
+
+Rows of a file are spooled (in memory, then on disk) and only appended
+once the whole file was read: a file that fails adds no row and uses no
+id, as silent parsing reports the whole file as failed.
+"""
+import csv
+import os
+import shutil
+import tempfile
+from collections import Counter
+from contextlib import ExitStack
+from typing import BinaryIO
+
+from py2flat.errors import Errors
+from py2flat.schemas import Schema
+from py2flat.stats import Stats
+
+ID_COLUMN = "_id"
+PARENT_ID_COLUMN = "_parent_id"
+# Bytes of rows kept in memory per segment before spooling to disk
+SPOOL_SIZE = 1 << 20
+
+
+class CsvSink:
+    """Write parsed files as one CSV file per segment, in directory.
+
+    Use as a context manager, every segment file is created on enter, with
+    its header row, so empty segments still get a file."""
+
+    def __init__(self, schema: Schema, directory: str, delimiter: str = ",") -> None:
+        self.schema = schema
+        self.directory = directory
+        self.delimiter = delimiter
+        self.extension = "tsv" if delimiter == "\t" else "csv"
+        self.rows = Counter()  # per segment, also the last id
+        self._files = {}
+        self._stack = None
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.{self.extension}")
+
+    def __enter__(self) -> "CsvSink":
+        os.makedirs(self.directory, exist_ok=True)
+        with ExitStack() as stack:
+            for seg in self.schema.segments:
+                file = stack.enter_context(
+                    open(self.path(seg.name), "w", newline="", encoding="utf-8")
+                )
+                csv.writer(file, delimiter=self.delimiter).writerow(
+                    [ID_COLUMN, PARENT_ID_COLUMN]
+                    + [element.name for element in seg.elements]
+                )
+                self._files[seg.name] = file
+            self._stack = stack.pop_all()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._stack.close()
+        self._files = {}
+
+    def _spool(self, stack: ExitStack) -> tuple:
+        spool = stack.enter_context(
+            tempfile.SpooledTemporaryFile(
+                SPOOL_SIZE, "w+", newline="", encoding="utf-8"
+            )
+        )
+        return spool, csv.writer(spool, delimiter=self.delimiter)
+
+    def write(
+        self, fileobj: BinaryIO, stats: Stats = None, errors: Errors = None
+    ) -> int:
+        """Stream the lines of a binary file object, return the number of
+        rows written (none when it fails)."""
+        by_name = self.schema.by_name
+        rows, added = self.rows, Counter()
+        # Id of the last row of each segment within the current record
+        last = {}
+
+        with ExitStack() as stack:
+            spools = {}
+            for name, values in self.schema.iter_values(fileobj, stats, errors):
+                parent = by_name[name].parent
+                if parent:
+                    if parent not in last:
+                        raise ValueError("Orphan line")
+                    parent_id = last[parent]
+                else:
+                    last.clear()
+                    parent_id = None
+
+                if name not in spools:
+                    spools[name] = self._spool(stack)
+                added[name] += 1
+                last[name] = rows[name] + added[name]
+                spools[name][1].writerow((last[name], parent_id, *values))
+
+            # The whole file was read
+            for name, (spool, _) in spools.items():
+                spool.seek(0)
+                shutil.copyfileobj(spool, self._files[name])
+
+        rows.update(added)
+        return sum(added.values())
+
+    def write_file(
+        self, filepath: str, stats: Stats = None, errors: Errors = None
+    ) -> int:
+        with ExitStack() as stack:
+            for collector in (stats, errors):
+                if collector is not None:
+                    stack.enter_context(collector.file(os.path.basename(filepath)))
+            file = stack.enter_context(open(filepath, "rb"))
+            return self.write(file, stats, errors)
@@ -0,0 +1,204 @@
+"""Opt-in parsing statistics.
+
+Pass a Stats instance to read_file, read_dir, read_str or read_bytes to
+count lines per segment and bytes, and to time each phase (unpack, parse,
+convert, asdict), each element and each file. When writing,
+Exchange.add_segment, add_segments and ExchangeWriter time encoding,
+Exchange.dump the final join. Decoding is timed element by element, which
+slows parsing down: only use it to investigate.
+"""
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Generator
+
+from py2flat.element import CastDecoder, ConvertDecoder
+
+if TYPE_CHECKING:
+    from py2flat.plans import SegmentPlan
+
+PHASES = ("unpack", "parse", "convert", "asdict", "encode", "dump")
+
+
+def _failed(decoder: CastDecoder, item: str) -> bool:
+    """Whether a non-blank value fell back to the default because it
+    couldn't be cast or converted."""
+    item = item.strip()
+    if not item:
+        return False
+
+    try:
+        value = decoder.cast(item)
+        if isinstance(decoder, ConvertDecoder):
+            decoder.convert(value)
+    except Exception:  # pylint: disable=broad-except
+        return True
+    return False
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1e3:.1f}ms"
+
+
+@dataclass(kw_only=True)
+class Stats:
+    lines: Counter = field(default_factory=Counter)  # per segment
+    bytes: int = 0
+    timings: Counter = field(default_factory=Counter)  # seconds per phase
+    elements: Counter = field(default_factory=Counter)  # seconds per element
+    failures: Counter = field(default_factory=Counter)  # per element
+    files: dict = field(default_factory=dict)  # wall time per file
+    _plans: dict = field(default_factory=dict, repr=False)
+
+    def count(self, name: str | None, size: int) -> None:
+        """One line of size bytes (line feed excluded), name is None for
+        unknown segments."""
+        self.lines[name or "?"] += 1
+        self.bytes += size + 1
+
+    def _keys(self, plan: "SegmentPlan") -> list[tuple]:
+        keys = self._plans.get(plan.name)
+        if keys is None:
+            keys = self._plans[plan.name] = [
+                (
+                    f"{plan.name}.{name}",
+                    "convert" if isinstance(decoder, ConvertDecoder) else "parse",
+                    isinstance(decoder, CastDecoder),
+                )
+                for name, decoder in zip(plan.names, plan.decoders)
+            ]
+        return keys
+
+    def decode(self, plan: "SegmentPlan", line: bytes) -> list:
+        """Timed counterpart of plan.decode."""
+        clock = time.perf_counter
+        timings, elements = self.timings, self.elements
+
+        start = clock()
+        items = plan.unpack(line)
+        now = clock()
+        timings["unpack"] += now - start
+
+        values = []
+        for (key, phase, cast), decoder, item in zip(
+            self._keys(plan), plan.decoders, items
+        ):
+            start = now
+            try:
+                value = decoder(item)
+            except Exception:
+                self.failures[key] += 1
+                raise
+            now = clock()
+            timings[phase] += now - start
+            elements[key] += now - start
+
+            if cast and value is decoder.default and _failed(decoder, item):
+                self.failures[key] += 1
+            values.append(value)
+
+        return values
+
+    def asdict(self, plan: "SegmentPlan", values: list, skip: bool = False) -> dict:
+        start = time.perf_counter()
+        res = plan.asdict(values, skip=skip)
+        self.timings["asdict"] += time.perf_counter() - start
+        return res
+
+    @contextmanager
+    def timer(self, phase: str) -> Generator[None, Any, Any]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[phase] += time.perf_counter() - start
+
+    @contextmanager
+    def file(self, name: str) -> Generator[None, Any, Any]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.files[name] = time.perf_counter() - start
+
+    def merge(self, other: "Stats") -> None:
+        """Add stats collected elsewhere (eg. a worker process)."""
+        self.lines.update(other.lines)
+        self.bytes += other.bytes
+        self.timings.update(other.timings)
+        self.elements.update(other.elements)
+        self.failures.update(other.failures)
+        self.files.update(other.files)
+
+    def report(self) -> dict:
+        return {
+            "lines": dict(self.lines.most_common()),
+            "bytes": self.bytes,
+            "timings": {
+                phase: self.timings[phase] for phase in PHASES if phase in self.timings
+            },
+            "elements": dict(self.elements.most_common()),
+            "failures": dict(self.failures.most_common()),
+            "files": dict(self.files),
+        }
+
+    def json(self) -> str:
+        return json.dumps(self.report(), indent=4)
+
+    def table(self, top: int = 10) -> str:
+        """Human readable report, slowest elements and files only."""
+        wall = sum(self.files.values())
+        speed = f"{self.bytes / wall / 1e6:.2f} MB/s" if wall else ""
+
+        sections = [
+            (
+                "total",
+                [
+                    ("files", len(self.files), _ms(wall)),
+                    ("bytes", self.bytes, speed),
+                ],
+            ),
+            ("lines", [(name, count, "") for name, count in self.lines.most_common()]),
+            (
+                "phases",
+                [
+                    (phase, "", _ms(self.timings[phase]))
+                    for phase in PHASES
+                    if phase in self.timings
+                ],
+            ),
+            (
+                "elements",
+                [
+                    (name, "", _ms(seconds))
+                    for name, seconds in self.elements.most_common(top)
+                ],
+            ),
+            (
+                "failures",
+                [(name, count, "") for name, count in self.failures.most_common()],
+            ),
+            (
+                "files",
+                [
+                    (name, "", _ms(seconds))
+                    for name, seconds in sorted(
+                        self.files.items(), key=lambda item: item[1], reverse=True
+                    )[:top]
+                ],
+            ),
+        ]
+
+        rows = []
+        for title, items in sections:
+            if items:
+                rows.append((f"[{title}]", "", ""))
+                rows += [(f"  {name}", count, value) for name, count, value in items]
+
+        width = max(len(row[0]) for row in rows)
+        return "\n".join(
+            f"{name:<{width}}  {count!s:>10}  {value:>12}".rstrip()
+            for name, count, value in rows
+        )
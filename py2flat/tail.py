@@ -0,0 +1,45 @@
+"""Checkpoints to parse growing files incrementally.
+
+A checkpoint holds where the previous run stopped: the byte offset after
+the last complete line, and the raw lines of the top-level record still
+open at that point, as its children may be appended later. It's a small
+JSON file, written atomically.
+"""
+import json
+import os
+from dataclasses import asdict, dataclass, field
+
+from py2flat.utils import atomic_write
+
+# Raw lines round-trip through JSON whatever their encoding
+ENCODING = "utf-8"
+ERRORS = "surrogateescape"
+
+
+@dataclass(kw_only=True)
+class Checkpoint:
+    offset: int = 0  # bytes consumed, complete lines only
+    inode: int = None  # a new inode means the file was replaced
+    pending: list[str] = field(default_factory=list)  # lines of the open record
+
+    @property
+    def lines(self) -> list[bytes]:
+        return [line.encode(ENCODING, ERRORS) for line in self.pending]
+
+    @lines.setter
+    def lines(self, lines: list[bytes]) -> None:
+        self.pending = [bytes(line).decode(ENCODING, ERRORS) for line in lines]
+
+    def json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def load(cls, filepath: str) -> "Checkpoint":
+        """Saved checkpoint, a new one when filepath doesn't exist."""
+        if not os.path.exists(filepath):
+            return cls()
+        with open(filepath, encoding="utf-8") as file:
+            return cls(**json.load(file))
+
+    def save(self, filepath: str) -> None:
+        atomic_write(filepath, self.json().encode("utf-8"))
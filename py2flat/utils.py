@@ -1,7 +1,12 @@
 import json
+import os
+from array import array
 from datetime import date, datetime
+from functools import lru_cache
 from json import JSONEncoder
-from typing import Any
+from typing import Any, Callable
+
+import unidecode
 
 PYTHON_TYPES = {
     "int": int,
@@ -9,6 +14,11 @@ PYTHON_TYPES = {
     "str": str,
 }
 DEFAULT_SEPARATOR = "space"
+PARENT_COLUMN = "_parent"
+DEFAULT_BATCH = 1000  # records encoded per batch by bulk writes
+DEFAULT_TRANSLITERATION = "unidecode"
+# Distinct non-ASCII strings kept in memory by transliteration
+TRANSLITERATION_CACHE_SIZE = 4096
 
 
 class DateTimeEncoder(JSONEncoder):
@@ -16,6 +26,8 @@ class DateTimeEncoder(JSONEncoder):
         if isinstance(obj, (date, datetime)):
             # return obj.isoformat()
             return str(obj)
+        if isinstance(obj, array):
+            return obj.tolist()
 
 
 def size_of(item: Any) -> int:
@@ -35,6 +47,109 @@ def is_equal(value: Any, length) -> bool:
     return not bool(size_of(value) > length)
 
 
+class _Transliteration(dict):
+    """str.translate() table filled on demand: unidecode works character by
+    character, each distinct one is looked up once."""
+
+    def __missing__(self, codepoint: int) -> str:
+        value = self[codepoint] = unidecode.unidecode(chr(codepoint))
+        return value
+
+
+_TRANSLITERATION = _Transliteration()
+
+
+@lru_cache(maxsize=TRANSLITERATION_CACHE_SIZE)
+def _unidecode(value: str) -> str:
+    return value.translate(_TRANSLITERATION)
+
+
+def to_ascii(value: str) -> str:
+    """unidecode, skipped for strings already in ASCII."""
+    if value.isascii():
+        return value
+    return _unidecode(value)
+
+
+def strip_non_ascii(value: str) -> str:
+    """Drop characters that can't be written in ASCII."""
+    if value.isascii():
+        return value
+    return value.encode("ascii", "ignore").decode()
+
+
+TRANSLITERATIONS = {
+    "unidecode": to_ascii,
+    "ignore": strip_non_ascii,
+    "none": None,
+}
+
+
+def truncate_bytes(value: str, size: int) -> str:
+    """Cut value to at most size bytes once encoded in UTF-8, whole
+    characters only."""
+    return value.encode()[:size].decode("utf-8", "ignore")
+
+
+def pad(value: str, size: int, fill: str, right: bool = False) -> str:
+    """Fit value to size bytes once encoded, fixed widths are read in bytes
+    while non-ASCII characters take several."""
+    if value.isascii():
+        width = len(value)
+    else:
+        value = truncate_bytes(value, size)
+        width = len(value.encode())
+
+    if width >= size:
+        return value
+    if right:
+        return fill * (size - width) + value
+    return value + fill * (size - width)
+
+
+def get_transliteration(name: str) -> Callable[[str], str] | None:
+    """Function applied to text values on export, None keeps them as is."""
+    if name not in TRANSLITERATIONS:
+        raise ValueError(f"Unknow transliteration: '{name}'")
+    return TRANSLITERATIONS[name]
+
+
 def json_dump(data):
     """Shortcut to json.dumps with custom encoder"""
     return json.dumps(data, indent=4, cls=DateTimeEncoder)
+
+
+# Exact type lookups, cheaper than DateTimeEncoder isinstance checks
+JSON_DEFAULTS = {datetime: str, date: str, array: array.tolist}
+
+
+def _json_default(obj: Any) -> Any:
+    encode = JSON_DEFAULTS.get(type(obj))
+    if encode is not None:
+        return encode(obj)
+    if isinstance(obj, (date, datetime)):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# Without indent, the C encoder is used
+_compact = JSONEncoder(separators=(",", ":"), default=_json_default)
+
+
+def json_line(data) -> str:
+    """Compact JSON on a single line, as written to NDJSON streams"""
+    return _compact.encode(data)
+
+
+def atomic_write(filepath: str, data: bytes) -> None:
+    """Write to a temporary file first, concurrent readers and interrupted
+    runs never see a partial file."""
+    import tempfile  # pylint: disable=import-outside-toplevel
+
+    directory = os.path.dirname(os.path.abspath(filepath))
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "wb", dir=directory, suffix=".tmp", delete=False
+    ) as file:
+        file.write(data)
+    os.replace(file.name, filepath)
@@ -1,8 +1,13 @@
+import re
+
 from setuptools import find_packages, setup
 
+with open("py2flat/__init__.py", encoding="utf-8") as file:
+    version = re.search(r'__version__ = "(.+)"', file.read()).group(1)
+
 setup(
     name="py2flat",
-    version="0.3.1",
+    version=version,
     description="Python parser",
     long_description=open("README.md", encoding="utf-8").read(),
     long_description_content_type="text/markdown",
@@ -30,10 +35,11 @@ setup(
         "unidecode",
     ],
     python_requires=">=3.10",
-    extras_require={},
+    extras_require={"numpy": ["numpy"]},
     entry_points={
         "console_scripts": [
             "py2flat = py2flat.cli:cli",
+            "py2flat-client = py2flat.client:main",
         ],
     },
 )
@@ -1,4 +1,5 @@
 import datetime
+import io
 
 import pytest
 
@@ -158,3 +159,86 @@ N               Commentaire 2"""
     )
 
     assert exchange.dump() == data
+
+
+def test_write_stream(parser_1):
+    data = """E999920240610
+L00000000000000000001       1
+N               Commentaire 1
+N               Commentaire 2
+L00000000000000000002       2"""
+
+    exchange = Exchange(parser_1)
+    exchange.set_header(
+        PRHFCY="9999",
+        RCPDAT=datetime.datetime(2024, 6, 10),
+    )
+
+    output = io.StringIO()
+    with exchange.open(output) as writer:
+        writer.add_segment(
+            "Lines",
+            {
+                "POHNUM": "00000000000000000001",
+                "POPLIN": 1,
+                "LotNumber": [
+                    {"YTEXTE": "Commentaire 1"},
+                    {"YTEXTE": "Commentaire 2"},
+                ],
+            },
+        )
+        writer.add_segment("Lines", {"POHNUM": "00000000000000000002", "POPLIN": 2})
+
+    assert output.getvalue() == data
+    assert exchange.segments == []
+
+
+def test_write_stream_errors(parser_1):
+    exchange = Exchange(parser_1)
+
+    with pytest.raises(ValueError):
+        with exchange.open(io.StringIO()) as writer:
+            writer.add_segment("Lines", {"POHNUM": "1", "POPLIN": 1})
+
+    with pytest.raises(ValueError):
+        with exchange.open(io.StringIO()) as writer:
+            writer.set_header(PRHFCY="9999")
+            writer.set_header(PRHFCY="9999")
+
+
+def test_create_segment(parser_1):
+    vals = {"POHNUM": "1", "POPLIN": 1, "LotNumber": [{"YTEXTE": "A"}]}
+    segments = parser_1.create_segment("Lines", vals)
+
+    assert [seg.name for seg in segments] == ["Lines", "LotNumber"]
+    assert "LotNumber" in vals
+
+    with pytest.raises(KeyError):
+        parser_1.create_segment("Lines", {"Unknown": 1})
+
+
+def test_write_many(parser_1):
+    records = [
+        {
+            "POHNUM": str(number).zfill(20),
+            "POPLIN": number,
+            "LotNumber": [{"YTEXTE": f"Commentaire {number}"}],
+        }
+        for number in range(1, 6)
+    ]
+
+    expected = Exchange(parser_1)
+    expected.set_header(PRHFCY="9999")
+    for vals in records:
+        expected.add_segment("Lines", vals)
+
+    exchange = Exchange(parser_1)
+    exchange.set_header(PRHFCY="9999")
+    exchange.add_segments("Lines", iter(records), batch=2)
+    assert exchange.dump() == expected.dump()
+
+    exchange = Exchange(parser_1)
+    exchange.set_header(PRHFCY="9999")
+    output = io.StringIO()
+    exchange.write_many(output, "Lines", (vals for vals in records), batch=2)
+    assert output.getvalue() == expected.dump()
@@ -0,0 +1,206 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+from click.testing import CliRunner
+
+from py2flat.cli import _schema_arg, cli
+from py2flat.parser import Parser
+
+SCHEMA = "./test_1/schema.json"
+
+
+@pytest.fixture
+def schema_1():
+    return Parser.from_file(SCHEMA)
+
+
+@pytest.fixture
+def drop(tmp_path):
+    path = tmp_path / "drop"
+    shutil.copytree("./test_1/in", path)
+    return path
+
+
+@pytest.fixture
+def broken(tmp_path):
+    with open("./test_1/in/4.edi", encoding="utf-8") as file:
+        header, line, *_ = file.read().splitlines()
+    path = tmp_path / "broken"
+    path.mkdir()
+    shutil.copy("./test_1/in/4.edi", path / "1.edi")
+    (path / "2.edi").write_text("\n".join([header, line, line[:40]]))
+    return path
+
+
+def _run(*args):
+    result = CliRunner().invoke(cli, [str(arg) for arg in args])
+    assert result.exit_code == 0, result.output
+    return result
+
+
+def _objects(result):
+    return [json.loads(line) for line in result.stdout.splitlines()]
+
+
+def test_cli_ndjson_file(schema_1, drop):
+    result = _run("parse", drop, "-s", SCHEMA, "-f", "ndjson")
+
+    objects = _objects(result)
+    assert sorted(item["file"] for item in objects) == sorted(os.listdir(drop))
+    assert len(objects[0]["content"]["Lines"]) == len(
+        schema_1.read_file(str(drop / objects[0]["file"]))["Lines"]
+    )
+    assert "4 object(s) written" in result.stderr
+
+
+def test_cli_ndjson_record(schema_1):
+    filepath = "./test_1/in/3.edi"
+    result = _run("parse", filepath, "-s", SCHEMA, "-f", "ndjson", "--unit", "record")
+
+    with open(filepath, "rb") as file:
+        records = list(schema_1.iter_records(file))
+    objects = _objects(result)
+    assert [item["segment"] for item in objects] == [name for name, _ in records]
+    assert {item["file"] for item in objects} == {"3.edi"}
+    assert len(objects[1]["values"]["LotNumber"]) == 30
+
+
+@pytest.mark.parametrize("unit", ["file", "record"])
+def test_cli_ndjson_silent(broken, unit):
+    result = _run(
+        "parse", broken, "-s", SCHEMA, "-f", "ndjson", "--unit", unit, "--silent"
+    )
+
+    objects = {item["file"]: item for item in _objects(result)}
+    failed = objects["2.edi"]
+    error = failed["error"] if unit == "record" else failed["content"]["error"]
+    assert "Line length is incorrect" in error
+    assert "error" not in json.dumps(objects["1.edi"])
+
+    result = CliRunner().invoke(
+        cli, ["parse", str(broken), "-s", SCHEMA, "-f", "ndjson", "--unit", unit]
+    )
+    assert result.exit_code != 0
+
+
+def test_cli_csv(broken, tmp_path):
+    output = tmp_path / "out"
+    result = _run("parse", broken, "-s", SCHEMA, "-f", "csv", "-o", output, "--silent")
+
+    assert sorted(os.listdir(output)) == ["Header.csv", "Lines.csv", "LotNumber.csv"]
+    # 4.edi only: 1 header, 2 lines, 2 lot numbers
+    assert "5 row(s) written" in result.stdout
+    assert "2.edi: " in result.stderr
+
+
+def test_cli_manifest(drop, tmp_path):
+    manifest = tmp_path / "manifest.json"
+    args = ("parse", drop, "-s", SCHEMA, "--manifest", manifest)
+
+    assert "4 file(s) found" in _run(*args).stdout
+    assert "0 file(s) found" in _run(*args).stdout
+
+    result = CliRunner().invoke(cli, [*map(str, args), "-f", "csv", "-o", tmp_path])
+    assert result.exit_code != 0
+    assert "--manifest" in result.output
+
+
+def test_cli_stats(drop):
+    result = _run("parse", drop, "-s", SCHEMA, "-f", "ndjson", "--stats", "json")
+
+    stderr = result.stderr
+    report = json.loads(stderr[stderr.index("{") : stderr.rindex("}") + 1])
+    assert sorted(report["files"]) == sorted(os.listdir(drop))
+    assert report["lines"]["Header"] == 4
+
+
+def test_cli_tail(schema_1, tmp_path):
+    filepath = tmp_path / "feed.edi"
+    shutil.copy("./test_1/in/4.edi", filepath)
+
+    result = _run("tail", filepath, "-s", SCHEMA, "--final")
+    assert json.loads(result.stdout) == json.loads(
+        json.dumps(schema_1.read_file(str(filepath)), default=str)
+    )
+    assert f"{os.path.getsize(filepath)} byte(s) read" in result.stderr
+    assert os.path.exists(f"{filepath}.checkpoint")
+
+    # Nothing new
+    assert not _run("tail", filepath, "-s", SCHEMA, "--final").stdout
+
+
+def test_cli_generate(schema_1, tmp_path):
+    output = tmp_path / "out.edi"
+    result = _run("generate", "-s", SCHEMA, "-n", 50, "-o", output, "--seed", 1)
+
+    count = int(result.stderr.split()[0])
+    with open(output, "rb") as file:
+        assert len(file.read().splitlines()) == count
+    assert schema_1.read_file(str(output))["Lines"]
+
+
+def test_cli_max_errors_report(tmp_path):
+    with open("./test_1/in/1.edi", encoding="utf-8") as file:
+        header, line = file.read().splitlines()[:2]
+    invalid = line[:21] + "XXXXXXXX" + line[29:]
+    source = tmp_path / "bad.edi"
+    source.write_text("\n".join([header, invalid, line, invalid, invalid]))
+    quarantine = tmp_path / "q.edi"
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            "parse",
+            str(source),
+            "-s",
+            SCHEMA,
+            "--max-errors",
+            "1",
+            "--quarantine",
+            str(quarantine),
+            "--stats",
+            "json",
+        ],
+    )
+
+    assert result.exit_code != 0
+    # Errors collected before aborting, the stats and the quarantined record
+    assert "bad.edi:2: [Lines.Field2]" in result.stderr
+    assert "2 error(s)" in result.stderr
+    assert '"lines"' in result.stderr
+    assert quarantine.read_text() == invalid + "\n"
+
+
+def test_cli_schema_arg(tmp_path):
+    assert _schema_arg("orders=./s.json") == ("orders", "./s.json")
+    assert _schema_arg("/data/a=b/s.json") == ("", "/data/a=b/s.json")
+    assert _schema_arg("s.json") == ("", "s.json")
+
+    filepath = tmp_path / "a=b.json"
+    filepath.write_text("{}")
+    assert _schema_arg(str(filepath)) == ("", str(filepath))
+
+
+def test_cli_lazy_imports():
+    # Only loaded by the commands and options that need them
+    heavy = ["asyncio", "concurrent.futures", "urllib.request", "pickle", "numpy"]
+    code = f"import sys, py2flat.cli; print([m for m in {heavy!r} if m in sys.modules])"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd="..",
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_cli_generate_stdout(schema_1):
+    result = _run("generate", "-s", SCHEMA, "-n", 20, "--seed", 1)
+
+    assert schema_1.read_str(result.stdout)["Lines"]
+    assert "line(s) generated" in result.stderr
@@ -61,3 +61,32 @@ def test_float_to_int_2():
 def test_date():
     assert Converter.by_name("SSAAMMJJ").input("20240501") == datetime(2024, 5, 1)
     assert Converter.by_name("SSAAMMJJ").output(datetime(2024, 5, 1)) == "20240501"
+
+
+@pytest.mark.parametrize("value", ["20240229", "00010101", "2024531", "202451"])
+def test_date_fast_path(value):
+    assert Converter.by_name("AAAAMMJJ").input(value) == datetime.strptime(
+        value, "%Y%m%d"
+    )
+
+
+@pytest.mark.parametrize("value", ["20240230", "2024053A", "00000101"])
+def test_date_invalid(value):
+    with pytest.raises(ValueError):
+        Converter.by_name("AAAAMMJJ").input(value)
+
+
+def test_date_input_many():
+    values = ["20240501", "20240502", "20240501"]
+    assert Converter.by_name("SSAAMMJJ").input_many(values) == [
+        datetime(2024, 5, 1),
+        datetime(2024, 5, 2),
+        datetime(2024, 5, 1),
+    ]
+    assert Converter.by_name("9v5").input_many(["000000001,50000"]) == [1.5]
+
+
+def test_date_output_from_string():
+    converter = Converter.by_name("AAAAMMJJ")
+    assert converter.output("20240531") == "20240531"
+    assert converter.output("2024-05-31") == "20240531"
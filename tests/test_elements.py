@@ -162,3 +162,70 @@ def test_dump_element_with_converter(value, result):
     )
     element.set_value(value)
     assert element.dump() == result
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["123456789000", " 123456789", "       1  ", "1", "          ", "", "1a"],
+)
+def test_compile_element(element_4, value):
+    element_4.required = False
+    decode = element_4.compile()
+    assert decode(value) == element_4.parse(value, truncate=True)
+
+
+def test_compile_element_3(element_3):
+    decode = element_3.compile()
+    assert decode("   Lorem ") == "Lorem"
+    assert decode("          ") is None
+
+
+def test_compile_element_errors(element_1, element_4):
+    with pytest.raises(ValueError):
+        element_1.compile()
+
+    element_4.converter = "Unknown"
+    with pytest.raises(ValueError):
+        element_4.compile()
+
+    element_4.converter = None
+    with pytest.raises(RequiredElementMissing):
+        element_4.compile()("1a")
+
+
+@pytest.mark.parametrize(
+    "value", ["Lorem", "Lorem ipsum dolor sit amet.", "Élan", None]
+)
+def test_encoder_element_3(element_3, value):
+    encode = element_3.encoder()
+    element_3.set_value(value)
+    assert encode(value) == element_3.dump()
+
+
+def test_encoder_element_4(element_4):
+    encode = element_4.encoder()
+    assert encode(123.45) == "              123450"
+    with pytest.raises(RequiredElementMissing):
+        encode(None)
+    with pytest.raises(ExceededSize):
+        encode(10**25)
+
+
+def test_encoder_element_1(element_1):
+    assert element_1.encoder()(None) == "IDX"
+    assert element_1.encoder(fill="0")("A") == "A00"
+
+
+@pytest.mark.parametrize(
+    "transliteration, result",
+    [("unidecode", "Elan      "), ("ignore", "lan       "), ("none", "Élan     ")],
+)
+def test_transliteration(element_3, transliteration, result):
+    assert element_3.encoder(transliteration=transliteration)("Élan") == result
+    element_3.set_value("Élan")
+    assert element_3.dump(transliteration=transliteration) == result
+
+
+def test_transliteration_errors(element_3):
+    with pytest.raises(ValueError):
+        element_3.encoder(transliteration="xxx")
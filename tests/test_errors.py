@@ -0,0 +1,115 @@
+import io
+
+import pytest
+
+from py2flat.errors import Errors
+from py2flat.exceptions import ErrorBudgetExceeded
+from py2flat.parser import Parser
+
+
+@pytest.fixture
+def schema_1():
+    return Parser.from_file("./test_1/schema.json")
+
+
+@pytest.fixture
+def lines():
+    with open("./test_1/in/1.edi", encoding="utf-8") as file:
+        header, line = file.read().splitlines()[:2]
+    # Required integer Field2 at 21:29
+    invalid = line[:21] + "XXXXXXXX" + line[29:]
+    lot = "N" + "LOT".ljust(250)
+    return header, line, invalid, lot
+
+
+def test_errors_skip_records(schema_1, lines):
+    header, line, invalid, lot = lines
+    content = "\r\n".join([header, line, invalid, lot, line[:40], line])
+
+    errors = Errors()
+    res = schema_1.read_str(content, errors=errors)
+
+    assert len(res["Lines"]) == 2
+    assert res["Header"] == schema_1.read_str("\n".join([header, line]))["Header"]
+    assert [(error.line, error.segment, error.element) for error in errors.errors] == [
+        (3, "Lines", "Field2"),
+        (5, "Lines", None),
+    ]
+
+    error = errors.errors[0]
+    assert error.offset == len(header) + len(line) + 4
+    assert error.value == "XXXXXXXX"
+    assert "3: [Lines.Field2]" in str(error)
+    assert str(error).count("'XXXXXXXX'") == 1
+    assert errors.errors[1].value == line[:40]
+    assert errors.records == 2
+    assert not errors.rejected
+
+
+def test_errors_quarantine(schema_1, lines):
+    header, line, invalid, lot = lines
+    errors = Errors(quarantine=True)
+    schema_1.read_str("\n".join([header, invalid, lot, line]), errors=errors)
+
+    # The whole record is dropped, children included
+    assert errors.rejected == [invalid.encode(), lot.encode()]
+
+
+def test_errors_orphan_and_missing_segments(schema_1, lines):
+    header, _, invalid, lot = lines
+    errors = Errors()
+    res = schema_1.read_str("\n".join([lot, header, invalid]), errors=errors)
+
+    assert list(res) == ["Header"]
+    assert errors.errors[0].message == "Orphan line"
+    assert errors.errors[-1].line is None
+    assert "Missing required segments" in errors.errors[-1].message
+
+
+def test_errors_budget(schema_1, lines):
+    header, line, invalid, _ = lines
+    content = "\n".join([header, invalid, line, invalid])
+
+    schema_1.read_str(content, errors=Errors(max_errors=2))
+    with pytest.raises(ErrorBudgetExceeded):
+        schema_1.read_str(content, errors=Errors(max_errors=1))
+
+
+def test_errors_columns(schema_1, lines):
+    header, line, invalid, _ = lines
+    res = schema_1.read_str(
+        "\n".join([header, invalid, line]), layout="columns", errors=Errors()
+    )
+
+    assert res["Lines"]["Field2"] == [1000]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_errors_read_dir(schema_1, jobs):
+    errors = Errors()
+    files = dict(schema_1.read_dir("./test_1/in", errors=errors, jobs=jobs))
+
+    assert files == dict(schema_1.read_dir("./test_1/in", silent=True))
+    assert all(error.file in files for error in errors.errors)
+
+
+def test_errors_iter_records(schema_1, lines):
+    header, line, invalid, _ = lines
+    content = "\n".join([header, invalid, line]).encode()
+
+    errors = Errors()
+    records = list(schema_1.iter_records(io.BytesIO(content), errors=errors))
+
+    assert [name for name, _ in records] == ["Header", "Lines"]
+    assert errors.errors[0].line == 2
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_errors_budget_silent(schema_1, lines, tmp_path, jobs):
+    header, line, invalid, _ = lines
+    for name in ("1.edi", "2.edi"):
+        (tmp_path / name).write_text("\n".join([header, invalid, line, invalid]))
+
+    errors = Errors(max_errors=1)
+    with pytest.raises(ErrorBudgetExceeded):
+        list(schema_1.read_dir(str(tmp_path), silent=True, errors=errors, jobs=jobs))
@@ -0,0 +1,75 @@
+import io
+import json
+
+import pytest
+
+from py2flat import generator
+from py2flat.parser import Parser
+
+
+@pytest.fixture
+def schema_1():
+    return Parser.from_file("./test_1/schema.json")
+
+
+@pytest.mark.parametrize("lines", [1, 10, 1000])
+def test_generate(schema_1, lines):
+    output = io.StringIO()
+    count = generator.generate(schema_1, output, lines)
+    content = output.getvalue()
+
+    assert count == content.count("\n") + 1
+    assert count <= max(lines, 5)
+    assert not content.endswith("\n")
+
+    res = schema_1.read_str(content)
+    assert "Header" in res
+    assert "Lines" in res
+
+
+def test_generate_seed(schema_1):
+    outputs = [io.StringIO() for _ in range(3)]
+    for output, seed in zip(outputs, [1, 1, 2]):
+        generator.generate(schema_1, output, 100, seed=seed)
+
+    assert outputs[0].getvalue() == outputs[1].getvalue()
+    assert outputs[0].getvalue() != outputs[2].getvalue()
+
+
+def test_generate_chunks(schema_1, monkeypatch):
+    monkeypatch.setattr(generator, "CHUNK_SIZE", 100)
+    chunked = io.StringIO()
+    generator.generate(schema_1, chunked, 500)
+
+    monkeypatch.undo()
+    output = io.StringIO()
+    generator.generate(schema_1, output, 500)
+
+    assert chunked.getvalue() == output.getvalue()
+
+
+def test_generate_records(schema_1):
+    records = list(generator.generate_records(schema_1, 100, fanout=1))
+
+    assert records[0][0] == "Header"
+    assert {name for name, _ in records[1:]} == {"Lines"}
+    assert all(len(vals.get("LotNumber", [])) <= 1 for _, vals in records[1:])
+
+
+@pytest.mark.parametrize("transliteration", ["unidecode", "ignore", "none"])
+def test_generate_transliteration(transliteration):
+    with open("../benchmarks/schemas/deep.json", encoding="utf-8") as file:
+        schema = Parser.from_dict(
+            dict(json.load(file), transliteration=transliteration)
+        )
+    output = io.StringIO()
+    generator.generate(schema, output, 500)
+    content = output.getvalue()
+
+    # Fixed widths are in bytes, whatever the characters kept
+    assert content.isascii() == (transliteration != "none")
+    records = list(schema.iter_records(io.BytesIO(content.encode())))
+    assert len(records) == len(list(generator.generate_records(schema, 500)))
+    assert any(not str(values).isascii() for _, values in records) == (
+        transliteration == "none"
+    )
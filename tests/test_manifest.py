@@ -0,0 +1,97 @@
+import os
+import shutil
+
+import pytest
+
+from py2flat.manifest import Manifest
+from py2flat.parser import Parser
+
+
+@pytest.fixture
+def schema_1():
+    return Parser.from_file("./test_1/schema.json")
+
+
+@pytest.fixture
+def drop(tmp_path):
+    path = tmp_path / "drop"
+    shutil.copytree("./test_1/in", path)
+    return path
+
+
+def _read(schema, path, manifest_path, results=False, **options):
+    manifest = Manifest.load(manifest_path, results=results)
+    return dict(schema.read_dir(str(path), manifest=manifest, **options))
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_manifest_done_markers(schema_1, drop, tmp_path, jobs):
+    manifest_path = str(tmp_path / "manifest.json")
+
+    first = _read(schema_1, drop, manifest_path, jobs=jobs)
+    assert first == dict(schema_1.read_dir(str(drop)))
+    assert not _read(schema_1, drop, manifest_path, jobs=jobs)
+
+    # Touched only: hashed, not parsed again
+    os.utime(drop / "1.edi", ns=(1, 1))
+    assert not _read(schema_1, drop, manifest_path, jobs=jobs)
+
+    shutil.copy(drop / "1.edi", drop / "5.edi")
+    with open(drop / "2.edi", "ab") as file:
+        file.write(b"\n")
+    assert sorted(_read(schema_1, drop, manifest_path, jobs=jobs)) == [
+        "2.edi",
+        "5.edi",
+    ]
+
+
+def test_manifest_results(schema_1, drop, tmp_path):
+    manifest_path = str(tmp_path / "manifest.json")
+
+    first = _read(schema_1, drop, manifest_path, results=True)
+    assert _read(schema_1, drop, manifest_path, results=True) == first
+
+    os.remove(drop / "3.edi")
+    second = _read(schema_1, drop, manifest_path, results=True)
+    assert sorted(second) == ["1.edi", "2.edi", "4.edi"]
+    assert len(os.listdir(f"{manifest_path}.d")) == 3
+
+
+def test_manifest_options(schema_1, drop, tmp_path):
+    manifest_path = str(tmp_path / "manifest.json")
+
+    _read(schema_1, drop, manifest_path)
+    # Results depend on the layout, everything is parsed again
+    res = _read(schema_1, drop, manifest_path, layout="columns")
+    assert len(res) == 4
+    assert "Field1" in res["1.edi"]["Header"]
+
+
+def test_manifest_inside_directory(schema_1, drop):
+    manifest_path = str(drop / ".manifest")
+
+    assert len(_read(schema_1, drop, manifest_path, results=True)) == 4
+    assert not _read(schema_1, drop, manifest_path)
+
+
+def test_manifest_lazy_results(schema_1, drop, tmp_path):
+    manifest_path = str(tmp_path / "manifest.json")
+
+    first = _read(schema_1, drop, manifest_path, results=True, layout="lazy")
+    second = _read(schema_1, drop, manifest_path, results=True, layout="lazy")
+    assert sorted(second) == sorted(first)
+    assert second["4.edi"]["Header"].asdict() == first["4.edi"]["Header"].asdict()
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_manifest_failed_files(schema_1, drop, tmp_path, jobs):
+    manifest_path = str(tmp_path / "manifest.json")
+    (drop / "5.edi").write_text("L 12\n")
+
+    first = _read(schema_1, drop, manifest_path, silent=True, jobs=jobs)
+    assert list(first["5.edi"]) == ["error"]
+    # Parsed again until it succeeds
+    assert _read(schema_1, drop, manifest_path, silent=True, jobs=jobs) == {
+        "5.edi": first["5.edi"]
+    }
+    assert str(drop / "5.edi") not in Manifest.load(manifest_path).entries
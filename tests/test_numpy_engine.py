@@ -0,0 +1,134 @@
+import datetime
+import io
+
+import pytest
+
+from py2flat import generator, numpy_engine
+from py2flat.parser import Parser
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def schema_1():
+    json_schema = {
+        "name": "test",
+        "collection": "test",
+        "version": "1.0",
+        "method": "first-1",
+        "segments": [
+            {
+                "name": "Lines",
+                "required": True,
+                "multiple": True,
+                "elements": [
+                    {
+                        "name": "ID",
+                        "string": "Identifier",
+                        "size": 1,
+                        "required": True,
+                        "default": "L",
+                    },
+                    {
+                        "name": "Quantity",
+                        "string": "Quantity",
+                        "size": 6,
+                        "ttype": "int",
+                        "justify": "right",
+                    },
+                    {
+                        "name": "Weight",
+                        "string": "Weight",
+                        "size": 8,
+                        "ttype": "int",
+                        "converter": "X 1 000",
+                        "justify": "right",
+                    },
+                    {
+                        "name": "Price",
+                        "string": "Price",
+                        "size": 16,
+                        "converter": "13v2",
+                    },
+                    {
+                        "name": "Date",
+                        "string": "Date",
+                        "size": 8,
+                        "converter": "AAAAMMJJ",
+                    },
+                    {
+                        "name": "Label",
+                        "string": "Label",
+                        "size": 10,
+                    },
+                ],
+            },
+        ],
+    }
+
+    return Parser.from_dict(json_schema)
+
+
+LINES = [
+    b"L    12    12500000000000123,4520240531Lorem",
+    b"L     0        0000000000000,0020240601",
+    b"L                                      ipsum",
+    b"L   1 2   -1000000000000001,0020240602dolor",
+    b"L000007000000010000000000001,5020240603sit amet",
+]
+CONTENT = b"\n".join(line.ljust(49) for line in LINES) + b"\n"
+
+
+@pytest.mark.parametrize("layout", ["nested", "columns"])
+def test_numpy_engine(schema_1, layout):
+    expected = schema_1.read_bytes(CONTENT, layout=layout)
+    assert numpy_engine.read(schema_1, CONTENT, layout) == expected
+    assert schema_1.read_bytes(CONTENT, layout=layout, engine="numpy") == expected
+
+
+def test_numpy_engine_values(schema_1):
+    res = numpy_engine.read(schema_1, CONTENT)
+
+    assert res["Lines"][0] == {
+        "ID": "L",
+        "Quantity": 12,
+        "Weight": 1.25,
+        "Price": 123.45,
+        "Date": datetime.datetime(2024, 5, 31),
+        "Label": "Lorem",
+    }
+    assert "Quantity" not in res["Lines"][3]
+    assert res["Lines"][3]["Weight"] == -1.0
+
+
+def test_numpy_engine_fallback(schema_1, monkeypatch):
+    # Short line: the Python path raises its usual error
+    assert numpy_engine.read(schema_1, b"L 12\n") is None
+    with pytest.raises(ValueError):
+        schema_1.read_bytes(b"L 12\n", engine="numpy")
+
+    monkeypatch.setattr(numpy_engine, "np", None)
+    assert numpy_engine.read(schema_1, CONTENT) is None
+    assert schema_1.read_bytes(CONTENT, engine="numpy") == schema_1.read_bytes(CONTENT)
+
+
+@pytest.mark.parametrize("filename", ["1.edi", "2.edi", "3.edi", "4.edi"])
+def test_numpy_engine_files(filename):
+    schema = Parser.from_file("./test_1/schema.json")
+    filepath = f"./test_1/in/{filename}"
+
+    assert schema.read_file(filepath, engine="numpy") == schema.read_file(filepath)
+    assert schema.read_file(
+        filepath, engine="numpy", memory_map=True, layout="columns"
+    ) == schema.read_file(filepath, layout="columns")
+
+
+@pytest.mark.parametrize("layout", ["nested", "columns"])
+def test_numpy_engine_deep(layout):
+    schema = Parser.from_file("../benchmarks/schemas/deep.json")
+    output = io.StringIO()
+    generator.generate(schema, output, 500)
+    content = output.getvalue().encode()
+
+    expected = schema.read_bytes(content, layout=layout)
+    assert numpy_engine.read(schema, content, layout) == expected
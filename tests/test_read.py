@@ -1,7 +1,13 @@
+import asyncio
 import datetime
+import io
+import pickle
+import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 import pytest
 
+from py2flat import generator, pool
 from py2flat.parser import Parser
 
 
@@ -216,3 +222,199 @@ def test_read_4(schema_1):
             },
         ],
     }
+
+
+def test_iter_records(schema_1):
+    with open("./test_1/in/3.edi", "rb") as file:
+        records = list(schema_1.iter_records(file))
+
+    assert [name for name, _ in records] == ["Header", "Lines", "Lines"]
+    assert len(records[1][1]["LotNumber"]) == 30
+    assert records[2][1]["LotNumber"][-1] == {
+        "LotNumberHeader": "N",
+        "Field1": "XXX231707961",
+    }
+
+
+def test_iter_records_missing_required(schema_1):
+    with open("./test_1/in/1.edi", "rb") as file:
+        lines = file.read().splitlines()[1:]
+
+    records = schema_1.iter_records(io.BytesIO(b"\n".join(lines)))
+    with pytest.raises(ValueError):
+        list(records)
+
+
+@pytest.mark.parametrize("filename", ["1.edi", "2.edi", "3.edi", "4.edi"])
+def test_read_memory_map(schema_1, filename):
+    filepath = f"./test_1/in/{filename}"
+    assert schema_1.read_file(filepath, memory_map=True) == schema_1.read_file(filepath)
+
+
+def test_read_dir_nested(schema_1, tmp_path):
+    for index, filename in enumerate(["1.edi", "2.edi", "3.edi"]):
+        folder = tmp_path / str(index)
+        folder.mkdir()
+        shutil.copy(f"./test_1/in/{filename}", folder / filename)
+
+    res = dict(schema_1.read_dir(str(tmp_path)))
+    assert sorted(res) == ["1.edi", "2.edi", "3.edi"]
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_read_dir_jobs(schema_1, ordered):
+    expected = dict(schema_1.read_dir("./test_1/in"))
+    res = list(schema_1.read_dir("./test_1/in", jobs=2, chunksize=1, ordered=ordered))
+
+    assert len(res) == len(expected)
+    assert dict(res) == expected
+
+
+def test_read_files_window(schema_1, monkeypatch):
+    submitted = []
+
+    class Executor(ThreadPoolExecutor):
+        def submit(self, *args, **kwargs):
+            submitted.append(args[1])
+            return super().submit(*args, **kwargs)
+
+    monkeypatch.setattr(pool, "ProcessPoolExecutor", Executor)
+    filepaths = [f"./test_1/in/{number}.edi" for number in range(1, 5)] * 3
+    res = pool.read_files(schema_1, filepaths, jobs=1, chunksize=1)
+
+    assert next(res)[0] == filepaths[0]
+    # Two chunks in flight, one more submitted once the first came back
+    assert submitted == [[filepath] for filepath in filepaths[:3]]
+    assert [filepath for filepath, _ in res] == filepaths[1:]
+
+
+def test_aread_file(schema_1):
+    res = asyncio.run(schema_1.aread_file("./test_1/in/2.edi"))
+    assert res == schema_1.read_file("./test_1/in/2.edi")
+
+
+def test_aread_dir_window(schema_1, tmp_path, monkeypatch):
+    for number in range(20):
+        shutil.copy("./test_1/in/1.edi", tmp_path / f"{number}.edi")
+    started = []
+    aread_file = schema_1.aread_file
+
+    async def counted(filepath, **options):
+        started.append(filepath)
+        return await aread_file(filepath, **options)
+
+    monkeypatch.setattr(schema_1, "aread_file", counted)
+
+    async def read():
+        results = schema_1.aread_dir(str(tmp_path), limit=4)
+        await anext(results)
+        # The consumer holds the first result: nothing more is started
+        await asyncio.sleep(0.1)
+        count = len(started)
+        rest = [item async for item in results]
+        return count, rest
+
+    count, rest = asyncio.run(read())
+    assert count == 5
+    assert len(rest) == 19
+
+
+def test_aread_dir(schema_1):
+    async def read():
+        return [item async for item in schema_1.aread_dir("./test_1/in", limit=2)]
+
+    res = asyncio.run(read())
+    assert dict(res) == dict(schema_1.read_dir("./test_1/in"))
+
+
+def test_read_columns(schema_1):
+    res = schema_1.read_file("./test_1/in/4.edi", layout="columns")
+
+    assert res["Header"]["Field2"] == ["FR00"]
+    assert res["Header"]["Field4"] == [None]
+    assert res["Lines"]["Field2"] == [2000, 3000]
+    assert res["LotNumber"]["Field1"] == ["XXX223810332", "TPK231804407"]
+    assert list(res["LotNumber"]["_parent"]) == [0, 1]
+
+    res = schema_1.read_file("./test_1/in/3.edi", layout="columns")
+    assert list(res["LotNumber"]["_parent"]) == 30 * [0] + 30 * [1]
+
+
+def test_read_columns_deep():
+    schema = Parser.from_file("../benchmarks/schemas/deep.json")
+    output = io.StringIO()
+    generator.generate(schema, output, 500)
+    content = output.getvalue().encode()
+
+    # Row index of the last line of each segment
+    rows, expected = {}, {"Line": [], "Lot": [], "Comment": []}
+    for name, _ in schema.iter_values(io.BytesIO(content)):
+        if name in expected:
+            expected[name].append(rows[schema.by_name[name].parent])
+        rows[name] = rows.get(name, -1) + 1
+
+    res = schema.read_bytes(content, layout="columns")
+    assert expected["Lot"]
+    assert {name: list(res[name]["_parent"]) for name in expected} == expected
+
+
+@pytest.mark.parametrize("filename", ["1.edi", "2.edi", "3.edi", "4.edi"])
+def test_read_lazy(schema_1, filename):
+    filepath = f"./test_1/in/{filename}"
+    res = schema_1.read_file(filepath, layout="lazy")
+    expected = schema_1.read_file(filepath)
+
+    assert res["Header"].asdict(skip=True) == expected["Header"]
+    assert [line.asdict(skip=True) for line in res["Lines"]] == expected["Lines"]
+
+
+def test_read_lazy_record(schema_1):
+    res = schema_1.read_file("./test_1/in/3.edi", layout="lazy")
+    line = res["Lines"][1]
+
+    assert not hasattr(line, "__dict__")
+    assert line.Field2 == 2000
+    assert line["Field8"] == "ALE-10 MAGNETIC ALPHABETIC KEYBOARD"
+    assert line.Field7 is None
+    assert len(line.LotNumber) == 30
+    assert line.LotNumber[0].Field1 == "XXX231707847"
+
+    with pytest.raises(KeyError):
+        line["Unknown"]
+
+
+def test_read_lazy_pickle(schema_1):
+    res = schema_1.read_file("./test_1/in/3.edi", layout="lazy")
+    line = res["Lines"][1]
+    assert line.Field2 == 2000
+
+    copy = pickle.loads(pickle.dumps(line))
+    assert type(copy).__name__ == "LinesRecord"
+    assert copy.asdict() == line.asdict()
+    assert copy.LotNumber[0].Field1 == "XXX231707847"
+
+
+def _asdicts(res):
+    return {
+        name: [item.asdict() for item in items]
+        if isinstance(items, list)
+        else items.asdict()
+        for name, items in res.items()
+    }
+
+
+def test_read_lazy_processes(schema_1):
+    expected = {
+        filepath: _asdicts(res)
+        for filepath, res in schema_1.read_dir("./test_1/in", layout="lazy")
+    }
+    res = schema_1.read_dir("./test_1/in", layout="lazy", jobs=2)
+    assert {filepath: _asdicts(item) for filepath, item in res} == expected
+
+    async def read():
+        with ProcessPoolExecutor(1) as executor:
+            return await schema_1.aread_file(
+                "./test_1/in/4.edi", executor=executor, layout="lazy"
+            )
+
+    assert _asdicts(asyncio.run(read())) == expected["4.edi"]
@@ -49,3 +49,70 @@ def test_read_schema(schema_1):
     assert schema.method == "first-3"
     assert schema.count == 1
     assert list(schema.by_name.keys()) == ["Header"]
+
+
+def test_segment_plans(schema_1):
+    schema = Parser.from_str(schema_1)
+    plan = schema.plans["ENT"]
+
+    assert plan.name == "Header"
+    assert plan.size == 23
+    assert plan.offsets == (0, 3)
+    assert plan.decode(b"ENTJohn Doe            ") == ["ENT", "John Doe"]
+
+
+@pytest.fixture
+def schema_2():
+    def segment(name, identifier, **options):
+        return {
+            "name": name,
+            "elements": [
+                {
+                    "name": "ID",
+                    "string": "Identifier",
+                    "size": len(identifier),
+                    "required": True,
+                    "default": identifier,
+                },
+                {"name": "Value", "string": "Value", "size": 6},
+            ],
+            **options,
+        }
+
+    json_schema = {
+        "name": "test",
+        "collection": "test",
+        "version": "1.0",
+        "method": "prefix",
+        "segments": [
+            segment("Header", "HD", required=True),
+            segment("Lines", "LN", multiple=True),
+            segment("LotNumber", "LNLT", multiple=True, parent="Lines"),
+        ],
+    }
+    return Parser.from_dict(json_schema)
+
+
+def test_prefix_identifiers(schema_2):
+    assert schema_2.dispatcher.sizes == (4, 2)
+
+    data = "HDfoo   \nLNbar   \nLNLTbaz   \nLNLTqux   \nXXunknown\nLNquux  \n"
+    assert schema_2.read_str(data) == {
+        "Header": {"ID": "HD", "Value": "foo"},
+        "Lines": [
+            {
+                "ID": "LN",
+                "Value": "bar",
+                "LotNumber": [
+                    {"ID": "LNLT", "Value": "baz"},
+                    {"ID": "LNLT", "Value": "qux"},
+                ],
+            },
+            {"ID": "LN", "Value": "quux"},
+        ],
+    }
+    assert schema_2.read_str(data, engine="numpy") == schema_2.read_str(data)
+
+    schema_2.raise_if_unknown_segment = True
+    with pytest.raises(ValueError):
+        schema_2.read_str(data)
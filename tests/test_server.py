@@ -0,0 +1,119 @@
+import datetime
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from py2flat import client
+from py2flat.parser import Parser
+from py2flat.server import Server
+
+
+@pytest.fixture(scope="module")
+def server():
+    schema = Parser.from_file("./test_1/schema.json")
+    server = Server({"test": schema}, port=0, workers=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_server_schemas(server):
+    assert client.schemas(url=server.url) == ["test"]
+
+
+def test_server_parse(server):
+    filepath = os.path.abspath("./test_1/in/1.edi")
+    res = client.parse("test", filepath, url=server.url)
+
+    expected = Parser.from_file("./test_1/schema.json").read_file(filepath)
+    expected["Header"]["Field3"] = str(datetime.datetime(2024, 5, 31))
+    assert res["content"] == expected
+    assert res["elapsed"] > 0
+
+
+def test_server_errors(server):
+    res = client.parse("unknown", "./test_1/in/1.edi", url=server.url)
+    assert res["error"] == "Unknow schema 'unknown'"
+
+    res = client.parse("test", "./test_1/in/missing.edi", url=server.url)
+    assert "error" in res
+
+    res = client.request("/xxx", {}, url=server.url)
+    assert res["error"] == "Unknow path '/xxx'"
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"layout": "lazy"}, {"unknown": 1}, {"silent": 1}, {"engine": "fast"}],
+)
+def test_server_parse_options(server, options):
+    filepath = os.path.abspath("./test_1/in/1.edi")
+    with pytest.raises(urllib.error.HTTPError) as info:
+        urllib.request.urlopen(
+            urllib.request.Request(
+                f"{server.url}/parse",
+                data=json.dumps(
+                    {"schema": "test", "path": filepath, "options": options}
+                ).encode(),
+            )
+        )
+    assert info.value.code == 400
+
+    res = client.parse("test", filepath, url=server.url, layout="columns")
+    assert res["content"]["Lines"]["Field2"]
+
+
+def test_server_write(server):
+    schema = Parser.from_file("./test_1/schema.json")
+    with open("./test_1/in/1.edi", encoding="utf-8") as file:
+        data = file.read()
+    values = schema.read_str(data)
+
+    header = dict(values["Header"], Field3="20240531")
+    segments = [{"identifier": "Lines", "values": vals} for vals in values["Lines"]]
+    res = client.request(
+        "/write",
+        {"schema": "test", "header": header, "segments": segments},
+        url=server.url,
+    )
+    assert schema.read_str(res["content"]) == values
+
+
+@pytest.mark.parametrize("date", [None, "2024-05-31"])
+def test_server_parse_then_write(server, date):
+    """/parse output (dates as strings) is sent back to /write as is."""
+    filepath = os.path.abspath("./test_1/in/1.edi")
+    content = client.parse("test", filepath, url=server.url)["content"]
+
+    header = content["Header"]
+    if date:
+        header["Field3"] = date
+    segments = [{"identifier": "Lines", "values": vals} for vals in content["Lines"]]
+    res = client.request(
+        "/write",
+        {"schema": "test", "header": header, "segments": segments},
+        url=server.url,
+    )
+
+    schema = Parser.from_file("./test_1/schema.json")
+    assert "error" not in res
+    assert schema.read_str(res["content"]) == schema.read_file(filepath)
+
+
+def test_client_main(server, tmp_path, capsys):
+    output = tmp_path / "out.json"
+    code = client.main(
+        ["./test_1/in/1.edi", "-s", "test", "--url", server.url, "-o", str(output)]
+    )
+
+    assert code == 0
+    assert json.loads(output.read_text())["Header"]["Field5"] == "T009999"
+    assert "Parsed in" in capsys.readouterr().err
+
+    assert client.main(["./test_1/in/1.edi", "-s", "unknown", "--url", server.url])
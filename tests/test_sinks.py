@@ -0,0 +1,83 @@
+import csv
+
+import pytest
+
+from py2flat.errors import Errors
+from py2flat.parser import Parser
+from py2flat.sinks import ID_COLUMN, PARENT_ID_COLUMN, CsvSink
+
+
+@pytest.fixture
+def schema_1():
+    return Parser.from_file("./test_1/schema.json")
+
+
+def _rows(sink, name):
+    with open(sink.path(name), newline="", encoding="utf-8") as file:
+        return list(csv.DictReader(file, delimiter=sink.delimiter))
+
+
+def test_csv_sink(schema_1, tmp_path):
+    with CsvSink(schema_1, str(tmp_path)) as sink:
+        count = sink.write_file("./test_1/in/2.edi")
+        count += sink.write_file("./test_1/in/4.edi")
+
+    assert count == 4 + 5
+    headers, lines, lots = (_rows(sink, name) for name in schema_1.by_name)
+
+    assert [row[ID_COLUMN] for row in headers] == ["1", "2"]
+    assert [row[ID_COLUMN] for row in lines] == ["1", "2", "3", "4"]
+    assert all(not row[PARENT_ID_COLUMN] for row in headers + lines)
+    # Ids go on across files, children point to their own parent
+    assert [row[PARENT_ID_COLUMN] for row in lots] == ["2", "3", "4"]
+
+    res = schema_1.read_file("./test_1/in/2.edi")
+    assert lines[0]["Field2"] == str(res["Lines"][0]["Field2"])
+    assert headers[0]["Field3"] == str(res["Header"]["Field3"])
+    assert list(headers[0])[2:] == [
+        element.name for element in schema_1.segments[0].elements
+    ]
+
+
+def test_tsv_sink(schema_1, tmp_path):
+    with CsvSink(schema_1, str(tmp_path), delimiter="\t") as sink:
+        pass
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "Header.tsv",
+        "Lines.tsv",
+        "LotNumber.tsv",
+    ]
+    assert not _rows(sink, "Lines")
+
+
+def test_csv_sink_errors(schema_1, tmp_path):
+    with open("./test_1/in/4.edi", encoding="utf-8") as file:
+        header, line, lot, *_ = file.read().splitlines()
+    source = tmp_path / "in.edi"
+    invalid = line[:21] + "XXXXXXXX" + line[29:]
+    source.write_text("\n".join([header, invalid, lot, line, lot]))
+
+    errors = Errors()
+    with CsvSink(schema_1, str(tmp_path / "out")) as sink:
+        sink.write_file(str(source), errors=errors)
+
+    assert len(errors) == 1
+    assert [row[PARENT_ID_COLUMN] for row in _rows(sink, "LotNumber")] == ["1"]
+
+
+def test_csv_sink_failed_file(schema_1, tmp_path):
+    with open("./test_1/in/4.edi", encoding="utf-8") as file:
+        header, line, *_ = file.read().splitlines()
+    source = tmp_path / "in.edi"
+    source.write_text("\n".join([header, line, line[:40]]))
+
+    with CsvSink(schema_1, str(tmp_path / "out")) as sink:
+        with pytest.raises(ValueError):
+            sink.write_file(str(source))
+        count = sink.write_file("./test_1/in/2.edi")
+
+    # Nothing of the failed file, ids go on without a gap
+    assert count == sum(sink.rows.values()) == 4
+    assert [row[ID_COLUMN] for row in _rows(sink, "Header")] == ["1"]
+    assert [row[ID_COLUMN] for row in _rows(sink, "Lines")] == ["1", "2"]
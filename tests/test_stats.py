@@ -0,0 +1,87 @@
+import io
+import os
+
+import pytest
+
+from py2flat.exchange import Exchange
+from py2flat.parser import Parser
+from py2flat.stats import Stats
+
+
+@pytest.fixture
+def schema_1():
+    return Parser.from_file("./test_1/schema.json")
+
+
+def test_stats_read_file(schema_1):
+    stats = Stats()
+    res = schema_1.read_file("./test_1/in/1.edi", stats=stats)
+
+    assert res == schema_1.read_file("./test_1/in/1.edi")
+    assert stats.lines == {"Header": 1, "Lines": 1}
+    assert 0 < stats.bytes <= os.path.getsize("./test_1/in/1.edi")
+    assert set(stats.timings) == {"unpack", "parse", "convert", "asdict"}
+    assert "Header.Field3" in stats.elements
+    assert list(stats.files) == ["1.edi"]
+    assert not stats.failures
+
+
+def test_stats_failures(schema_1):
+    with open("./test_1/in/1.edi", encoding="utf-8") as file:
+        content = file.read()
+    # Invalid date, silently replaced by the default
+    content = content[:5] + "2024XX31" + content[13:]
+
+    stats = Stats()
+    res = schema_1.read_str(content, stats=stats)
+
+    assert "Field3" not in res["Header"]
+    assert stats.failures == {"Header.Field3": 1}
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_stats_read_dir(schema_1, jobs):
+    stats = Stats()
+    files = list(schema_1.read_dir("./test_1/in", stats=stats, jobs=jobs, chunksize=1))
+
+    assert sorted(stats.files) == sorted(name for name, _ in files)
+    assert stats.lines["Header"] == len(files)
+    assert stats.report()["lines"] == dict(stats.lines.most_common())
+    assert "[lines]" in stats.table()
+
+
+def test_stats_dump(schema_1):
+    exchange = Exchange(schema_1)
+    exchange.set_header(Field2="FR00", Field5="T009999")
+    exchange.add_segment(
+        "Lines", {"Field1": "PO1", "Field2": 1, "Field3": "CJ1", "Field5": 1}
+    )
+
+    stats = Stats()
+    content = exchange.dump(stats=stats)
+
+    assert stats.lines == {"Header": 1, "Lines": 1}
+    assert stats.bytes == len(content) + 1
+    assert "dump" in stats.timings
+
+
+def test_stats_encode(schema_1):
+    lines = [{"Field1": "PO1", "Field2": 1, "Field3": "CJ1", "Field5": 1}] * 3
+
+    stats = Stats()
+    exchange = Exchange(schema_1)
+    exchange.set_header(Field2="FR00", Field5="T009999")
+    exchange.add_segment("Lines", lines[0], stats=stats)
+    exchange.add_segments("Lines", lines, stats=stats)
+    assert "encode" in stats.timings
+    assert not stats.lines
+
+    stats = Stats()
+    output = io.StringIO()
+    with Exchange(schema_1).open(output, stats) as writer:
+        writer.set_header(Field2="FR00", Field5="T009999")
+        writer.add_segments("Lines", lines)
+
+    assert stats.lines == {"Header": 1, "Lines": 3}
+    assert stats.bytes == len(output.getvalue()) + 1
+    assert "encode" in stats.timings
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from py2flat.parser import Parser
+from py2flat.tail import Checkpoint
+
+
+@pytest.fixture
+def schema_1():
+    return Parser.from_file("./test_1/schema.json")
+
+
+@pytest.fixture
+def content():
+    with open("./test_1/in/4.edi", "rb") as file:
+        return file.read()
+
+
+def _merge(total: dict, data: dict) -> None:
+    for name, values in data.items():
+        if isinstance(values, list):
+            total.setdefault(name, []).extend(values)
+        else:
+            total[name] = values
+
+
+@pytest.mark.parametrize("size", [1, 100, 1000])
+def test_tail_chunks(schema_1, content, tmp_path, size):
+    filepath = tmp_path / "drop.edi"
+    checkpoint_path = str(tmp_path / "drop.checkpoint")
+    filepath.write_bytes(b"")
+
+    total = {}
+    for start in range(0, len(content), size):
+        with open(filepath, "ab") as file:
+            file.write(content[start : start + size])
+        checkpoint = Checkpoint.load(checkpoint_path)
+        data, checkpoint = schema_1.read_tail(str(filepath), checkpoint)
+        checkpoint.save(checkpoint_path)
+        _merge(total, data)
+
+    data, checkpoint = schema_1.read_tail(
+        str(filepath), Checkpoint.load(checkpoint_path), final=True
+    )
+    _merge(total, data)
+
+    assert total == schema_1.read_file("./test_1/in/4.edi")
+    assert checkpoint.offset == len(content)
+    assert not checkpoint.pending
+
+
+def test_tail_children_later(schema_1, content, tmp_path):
+    header, line, lot, *_ = content.splitlines(keepends=True)
+    filepath = tmp_path / "drop.edi"
+    filepath.write_bytes(header + line)
+
+    data, checkpoint = schema_1.read_tail(str(filepath))
+    # Lines may still get children
+    assert list(data) == ["Header"]
+    assert checkpoint.lines == [line.rstrip(b"\r\n")]
+
+    with open(filepath, "ab") as file:
+        file.write(lot + line)
+    data, checkpoint = schema_1.read_tail(str(filepath), checkpoint)
+
+    assert len(data["Lines"]) == 1
+    assert data["Lines"][0]["LotNumber"]
+    assert checkpoint.offset == os.path.getsize(filepath)
+
+
+def test_tail_replaced(schema_1, content, tmp_path):
+    filepath = tmp_path / "drop.edi"
+    filepath.write_bytes(content)
+    _, checkpoint = schema_1.read_tail(str(filepath))
+
+    # Truncated then written again: read from the start, the new header
+    # closes the record pending from the previous file
+    header, line = content.splitlines(keepends=True)[:2]
+    filepath.write_bytes(header + line)
+    data, _ = schema_1.read_tail(str(filepath), checkpoint, final=True)
+
+    assert len(data["Lines"]) == 2
+    assert "Header" in data
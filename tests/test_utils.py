@@ -1,8 +1,18 @@
-from datetime import datetime
+import json
+from array import array
+from datetime import date, datetime
 
 import pytest
+import unidecode
 
-from py2flat.utils import is_equal, size_of
+from py2flat.utils import (
+    atomic_write,
+    is_equal,
+    json_dump,
+    json_line,
+    size_of,
+    to_ascii,
+)
 
 
 @pytest.mark.parametrize(
@@ -31,3 +41,34 @@ def test_size_of(value, result):
 )
 def test_is_equal(value, length):
     assert is_equal(value, length)
+
+
+def test_json_line():
+    data = {
+        "Header": {"Date": datetime(2024, 5, 31), "Day": date(2024, 5, 31)},
+        "Lines": {"Field2": [1000, 2000], "_parent": array("q", [0, 0])},
+    }
+    line = json_line(data)
+
+    assert "\n" not in line
+    assert json.loads(line) == json.loads(json_dump(data))
+
+    with pytest.raises(TypeError):
+        json_line({"value": object()})
+
+
+def test_atomic_write(tmp_path):
+    filepath = tmp_path / "sub" / "file.json"
+    atomic_write(str(filepath), b"first")
+    atomic_write(str(filepath), b"second")
+
+    assert filepath.read_bytes() == b"second"
+    assert [path.name for path in filepath.parent.iterdir()] == ["file.json"]
+
+
+@pytest.mark.parametrize(
+    "value", ["Élan", "Crème brûlée", "Straße", "Ωμέγα", "北京", "naïve café" * 50]
+)
+def test_to_ascii(value):
+    # Character by character, same output as unidecode on the whole string
+    assert to_ascii(value) == unidecode.unidecode(value)